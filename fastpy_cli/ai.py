@@ -2,9 +2,17 @@
 
 import json
 import os
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable, Optional
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 import httpx
 from rich.console import Console
@@ -86,73 +94,120 @@ Rules:
 7. Always use "fastpy" as the command prefix (not "python cli.py")
 """
 
-# JSON Schema for validating AI responses
-COMMAND_SCHEMA = {
-    "type": "array",
-    "items": {
-        "type": "object",
-        "required": ["command", "description"],
-        "properties": {
-            "command": {"type": "string", "minLength": 1},
-            "description": {"type": "string"},
-        },
-        "additionalProperties": False,
-    },
-}
-
-
-def validate_json_schema(data: Any, schema: dict) -> tuple[bool, str]:
-    """Validate data against a JSON schema (simplified validation).
+# JSON Schema for validating AI responses, read-only so its compiled validator can't go stale
+COMMAND_SCHEMA = MappingProxyType(
+    {
+        "type": "array",
+        "items": MappingProxyType(
+            {
+                "type": "object",
+                "required": ("command", "description"),
+                "properties": MappingProxyType(
+                    {
+                        "command": MappingProxyType({"type": "string", "minLength": 1}),
+                        "description": MappingProxyType({"type": "string"}),
+                    }
+                ),
+                "additionalProperties": False,
+            }
+        ),
+    }
+)
+
+
+def _compile_schema(schema: Mapping) -> Callable[[Any], str]:
+    """Build a validator for a JSON schema (simplified validation).
+
+    The schema's keywords are read once here rather than on every value checked.
 
     Args:
-        data: Data to validate
-        schema: JSON schema dict
+        schema: JSON schema mapping
 
     Returns:
-        Tuple of (is_valid, error_message)
+        Callable returning an error message, or "" when the data is valid
     """
     schema_type = schema.get("type")
 
     if schema_type == "array":
-        if not isinstance(data, list):
-            return False, f"Expected array, got {type(data).__name__}"
-
-        items_schema = schema.get("items", {})
-        for i, item in enumerate(data):
-            is_valid, error = validate_json_schema(item, items_schema)
-            if not is_valid:
-                return False, f"Item {i}: {error}"
-
-    elif schema_type == "object":
-        if not isinstance(data, dict):
-            return False, f"Expected object, got {type(data).__name__}"
-
-        # Check required fields
-        required = schema.get("required", [])
-        for field in required:
-            if field not in data:
-                return False, f"Missing required field: {field}"
-
-        # Validate properties
-        properties = schema.get("properties", {})
-        for field, value in data.items():
-            if field in properties:
-                is_valid, error = validate_json_schema(value, properties[field])
-                if not is_valid:
-                    return False, f"Field '{field}': {error}"
-
-            # Check additionalProperties
-            elif schema.get("additionalProperties") is False:
-                return False, f"Unexpected field: {field}"
-
-    elif schema_type == "string":
-        if not isinstance(data, str):
-            return False, f"Expected string, got {type(data).__name__}"
+        check_item = _compile_schema(schema.get("items", {}))
+
+        def check_array(data: Any) -> str:
+            if not isinstance(data, list):
+                return f"Expected array, got {type(data).__name__}"
+            for i, item in enumerate(data):
+                error = check_item(item)
+                if error:
+                    return f"Item {i}: {error}"
+            return ""
+
+        return check_array
+
+    if schema_type == "object":
+        required = tuple(schema.get("required", ()))
+        properties = {
+            field: _compile_schema(field_schema)
+            for field, field_schema in schema.get("properties", {}).items()
+        }
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(data: Any) -> str:
+            if not isinstance(data, dict):
+                return f"Expected object, got {type(data).__name__}"
+
+            # Check required fields
+            for field in required:
+                if field not in data:
+                    return f"Missing required field: {field}"
+
+            # Validate properties
+            for field, value in data.items():
+                check_value = properties.get(field)
+                if check_value is not None:
+                    error = check_value(value)
+                    if error:
+                        return f"Field '{field}': {error}"
+
+                # Check additionalProperties
+                elif closed:
+                    return f"Unexpected field: {field}"
+            return ""
+
+        return check_object
+
+    if schema_type == "string":
         min_length = schema.get("minLength", 0)
-        if len(data) < min_length:
-            return False, f"String too short (min {min_length})"
 
-    return True, ""
+        def check_string(data: Any) -> str:
+            if not isinstance(data, str):
+                return f"Expected string, got {type(data).__name__}"
+            if len(data) < min_length:
+                return f"String too short (min {min_length})"
+            return ""
+
+        return check_string
+
+    return lambda data: ""
+
+
+_check_commands = _compile_schema(COMMAND_SCHEMA)
+
+
+def validate_json_schema(data: Any, schema: Mapping) -> tuple[bool, str]:
+    """Validate data against a JSON schema (simplified validation).
+
+    COMMAND_SCHEMA uses a validator compiled at import; other schemas are
+    compiled on each call.
+
+    Args:
+        data: Data to validate
+        schema: JSON schema mapping
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    check = _check_commands if schema is COMMAND_SCHEMA else _compile_schema(schema)
+    error = check(data)
+    return not error, error
 
 
 class AIProvider(ABC):
@@ -478,6 +533,17 @@ class GroqProvider(AIProvider):
             return None
 
 
+# Providers that need an API key: class, key variable, and where to get a key if worth showing
+_HOSTED_PROVIDERS: Mapping[str, tuple[type[AIProvider], str, Optional[str]]] = MappingProxyType(
+    {
+        "anthropic": (AnthropicProvider, "ANTHROPIC_API_KEY", None),
+        "openai": (OpenAIProvider, "OPENAI_API_KEY", None),
+        "google": (GoogleProvider, "GOOGLE_API_KEY", "https://aistudio.google.com/apikey"),
+        "groq": (GroqProvider, "GROQ_API_KEY", "https://console.groq.com/keys"),
+    }
+)
+
+
 def get_provider(
     provider: Optional[str] = None,
     api_key: Optional[str] = None,
@@ -500,49 +566,33 @@ def get_provider(
     provider = provider.lower()
     log_debug(f"Using AI provider: {provider}")
 
-    if provider == "anthropic":
-        key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    hosted = _HOSTED_PROVIDERS.get(provider)
+    if hosted is not None:
+        provider_cls, env_var, key_url = hosted
+        key = api_key or os.environ.get(env_var)
         if not key:
-            console.print("[red]Error:[/red] ANTHROPIC_API_KEY not set")
-            console.print("[dim]Set it with: export ANTHROPIC_API_KEY=your-key[/dim]")
+            console.print(f"[red]Error:[/red] {env_var} not set")
+            console.print(f"[dim]Set it with: export {env_var}=your-key[/dim]")
+            if key_url:
+                console.print(f"[dim]Get your key at: {key_url}[/dim]")
             return None
-        return AnthropicProvider(key)
+        return provider_cls(key)
 
-    elif provider == "openai":
-        key = api_key or os.environ.get("OPENAI_API_KEY")
-        if not key:
-            console.print("[red]Error:[/red] OPENAI_API_KEY not set")
-            console.print("[dim]Set it with: export OPENAI_API_KEY=your-key[/dim]")
-            return None
-        return OpenAIProvider(key)
-
-    elif provider == "google":
-        key = api_key or os.environ.get("GOOGLE_API_KEY")
-        if not key:
-            console.print("[red]Error:[/red] GOOGLE_API_KEY not set")
-            console.print("[dim]Set it with: export GOOGLE_API_KEY=your-key[/dim]")
-            console.print("[dim]Get your key at: https://aistudio.google.com/apikey[/dim]")
-            return None
-        return GoogleProvider(key)
-
-    elif provider == "groq":
-        key = api_key or os.environ.get("GROQ_API_KEY")
-        if not key:
-            console.print("[red]Error:[/red] GROQ_API_KEY not set")
-            console.print("[dim]Set it with: export GROQ_API_KEY=your-key[/dim]")
-            console.print("[dim]Get your key at: https://console.groq.com/keys[/dim]")
-            return None
-        return GroqProvider(key)
-
-    elif provider == "ollama":
+    if provider == "ollama":
         model = os.environ.get("OLLAMA_MODEL") or config.get("ai", "ollama_model")
         host = os.environ.get("OLLAMA_HOST") or config.get("ai", "ollama_host")
         return OllamaProvider(model=model, host=host)
 
-    else:
-        console.print(f"[red]Error:[/red] Unknown provider: {provider}")
-        console.print("[dim]Available: anthropic, openai, google, groq, ollama[/dim]")
-        return None
+    console.print(f"[red]Error:[/red] Unknown provider: {provider}")
+    console.print("[dim]Available: anthropic, openai, google, groq, ollama[/dim]")
+    return None
+
+
+# A markdown code block: the opening fence line, then everything up to the last fence line
+_CODE_FENCE_RE = re.compile(r"```[^\n]*\n(.*)^```", re.DOTALL | re.MULTILINE)
+
+# Old-style project CLI invocations that are rewritten to use fastpy
+_LEGACY_CLI_RE = re.compile(r"python3? cli\.py ")
 
 
 def parse_ai_response(response: str) -> list[dict]:
@@ -559,19 +609,13 @@ def parse_ai_response(response: str) -> list[dict]:
         response = response.strip()
 
         # Remove markdown code blocks if present
-        if response.startswith("```"):
-            lines = response.split("\n")
-            # Find the end of the code block
-            end_idx = len(lines) - 1
-            for i in range(len(lines) - 1, 0, -1):
-                if lines[i].startswith("```"):
-                    end_idx = i
-                    break
-            response = "\n".join(lines[1:end_idx])
+        fenced = _CODE_FENCE_RE.match(response)
+        if fenced:
+            response = fenced.group(1)
 
         log_debug(f"Parsing AI response: {response[:200]}...")
 
-        commands = json.loads(response)
+        commands = json_loads(response)
 
         # Validate against schema
         is_valid, error = validate_json_schema(commands, COMMAND_SCHEMA)
@@ -586,12 +630,9 @@ def parse_ai_response(response: str) -> list[dict]:
             command = cmd.get("command", "").strip()
 
             # Normalize old-style commands to use fastpy
-            if command.startswith("python cli.py "):
-                command = command.replace("python cli.py ", "fastpy ", 1)
-                cmd["command"] = command
-                log_debug(f"Normalized command: {command}")
-            elif command.startswith("python3 cli.py "):
-                command = command.replace("python3 cli.py ", "fastpy ", 1)
+            legacy = _LEGACY_CLI_RE.match(command)
+            if legacy:
+                command = "fastpy " + command[legacy.end() :]
                 cmd["command"] = command
                 log_debug(f"Normalized command: {command}")
 
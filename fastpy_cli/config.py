@@ -1,5 +1,6 @@
 """Configuration management for Fastpy CLI."""
 
+import functools
 import os
 from pathlib import Path
 from typing import Any, Optional
@@ -42,6 +43,35 @@ CONFIG_DIR = Path.home() / ".fastpy"
 CONFIG_FILE = CONFIG_DIR / "config.toml"
 
 
+@functools.lru_cache(maxsize=4)
+def _load_toml_cached(path: str, mtime_ns: int) -> dict[str, Any]:
+    """Parse a TOML file. Keyed on mtime so edits on disk invalidate the entry."""
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def load_config_file(path: Optional[Path] = None) -> dict[str, Any]:
+    """Load a TOML config file, reusing the parsed result while it is unchanged.
+
+    Args:
+        path: Config file to load (defaults to CONFIG_FILE)
+
+    Returns:
+        A copy of the parsed config whose sections can be modified freely
+    """
+    path = path or CONFIG_FILE
+    data = _load_toml_cached(str(path), path.stat().st_mtime_ns)
+    return {
+        section: dict(values) if isinstance(values, dict) else values
+        for section, values in data.items()
+    }
+
+
+def clear_config_file_cache() -> None:
+    """Drop cached config file contents after writing the file."""
+    _load_toml_cached.cache_clear()
+
+
 class Config:
     """Configuration manager for Fastpy CLI."""
 
@@ -57,14 +87,13 @@ class Config:
 
     def _load(self) -> None:
         """Load configuration from file and environment."""
-        # Start with defaults
-        self._config = DEFAULT_CONFIG.copy()
+        # Start with defaults, copying each section so updates never reach DEFAULT_CONFIG
+        self._config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
 
         # Load from config file if exists
         if CONFIG_FILE.exists():
             try:
-                with open(CONFIG_FILE, "rb") as f:
-                    file_config = tomllib.load(f)
+                file_config = load_config_file(CONFIG_FILE)
                 self._merge_config(file_config)
             except Exception as e:
                 console.print(f"[yellow]Warning:[/yellow] Failed to load config: {e}")
@@ -134,6 +163,7 @@ class Config:
 
         with open(CONFIG_FILE, "w") as f:
             f.write("\n".join(lines))
+        clear_config_file_cache()
 
     @property
     def ai_provider(self) -> str:
@@ -11,6 +11,8 @@ from rich.logging import RichHandler
 _logger: Optional[logging.Logger] = None
 _verbose: bool = False
 _debug: bool = False
+# (verbose, debug, log_file) of the last setup, so repeat calls can be skipped
+_last_setup: Optional[tuple[bool, bool, Optional[str]]] = None
 
 console = Console(stderr=True)
 
@@ -30,7 +32,11 @@ def setup_logger(
     Returns:
         Configured logger instance
     """
-    global _logger, _verbose, _debug
+    global _logger, _verbose, _debug, _last_setup
+
+    # Already configured this way (e.g. by main() and then a typer callback)
+    if _logger is not None and _last_setup == (verbose, debug, log_file):
+        return _logger
 
     _verbose = verbose
     _debug = debug
@@ -76,6 +82,7 @@ def setup_logger(
         logger.addHandler(file_handler)
 
     _logger = logger
+    _last_setup = (verbose, debug, log_file)
     return logger
 
 
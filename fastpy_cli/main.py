@@ -1,24 +1,45 @@
 #!/usr/bin/env python3
 """Fastpy CLI - Create production-ready FastAPI projects."""
 
+import contextlib
+import functools
+import importlib.util
+import io
+import mmap
 import os
+import re
+import shlex
 import shutil
 import subprocess
 import sys
+import threading
+from collections import deque
+from collections.abc import Iterator, Mapping, Sequence
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlsplit
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
+from rich.text import Text
 
 from fastpy_cli import __version__
-from fastpy_cli.config import CONFIG_FILE, get_config, init_config_file
+from fastpy_cli.config import (
+    CONFIG_FILE,
+    clear_config_file_cache,
+    get_config,
+    init_config_file,
+    load_config_file,
+)
 from fastpy_cli.logger import log_debug, log_error, log_info, setup_logger
 from fastpy_cli.utils import safe_execute_command, validate_command
 
+if TYPE_CHECKING:
+    import httpx
+    from rich.progress import Progress
+
 app = typer.Typer(
     name="fastpy",
     help="Create production-ready FastAPI projects with one command.",
@@ -29,83 +50,249 @@ console = Console()
 
 REPO_URL = "https://github.com/vutia-ent/fastpy.git"
 DOCS_URL = "https://fastpy.ve.ke"
+PYPI_JSON_URL = "https://pypi.org/pypi/fastpy-cli/json"
+
+# Platform dispatch and project venv layout, fixed for the life of the process
+_IS_WIN = sys.platform == "win32"
+_IS_MAC = sys.platform == "darwin"
+_VENV_BIN_REL = Path("venv", "Scripts") if _IS_WIN else Path("venv", "bin")
+_VENV_PY_REL = _VENV_BIN_REL / ("python.exe" if _IS_WIN else "python")
+_VENV_ACTIVATE = "venv\\Scripts\\activate" if _IS_WIN else "source venv/bin/activate"
+
+# pip stderr markers that indicate the MySQL client libraries failed to build
+_MYSQL_ERR_RE = re.compile(r"mysqlclient|mysql_config|mariadb_config|mysql\.h", re.IGNORECASE)
+# Requirement lines for MySQL driver packages, skipped by --skip-mysql
+_MYSQL_REQ_RE = re.compile(
+    r"^\s*(?:mysqlclient|pymysql|aiomysql)(?:\s|==|>=|<=|~=|!=|<|>|\[|;|$)", re.IGNORECASE
+)
+# Requirements-file comment: "#" at the start of a line or after whitespace, as pip reads it
+_REQ_COMMENT_RE = re.compile(r"(?:^|\s+)#.*$")
+# mysqlclient needs the MySQL client libraries (mysql_config) to build from source
+_MYSQLCLIENT_REQ_RE = re.compile(r"^\s*mysqlclient\b", re.IGNORECASE | re.MULTILINE)
+# Build variables install_mysql_client_macos exports into os.environ
+_MYSQL_BUILD_ENV_VARS = ("PATH", "LDFLAGS", "CPPFLAGS", "PKG_CONFIG_PATH")
+
+# pip at or above this version isn't upgraded by `fastpy install`
+_MIN_PIP_VERSION = (23, 0)
+_PIP_MIN_REQUIREMENT = "pip>={}.{}".format(*_MIN_PIP_VERSION)
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)")
+
+# pip output lines that mark a requirement as resolved, used to drive install progress
+_PIP_PROGRESS_PREFIXES = ("Collecting ", "Requirement already satisfied: ")
+# pip stderr kept for error reporting: the last lines plus the first MySQL-related ones
+_PIP_STDERR_TAIL_LINES = 200
+_PIP_STDERR_MYSQL_LINES = 10
+_REQUIREMENT_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+# Local services probed by `fastpy doctor`, keyed by name
+LOCAL_SERVICE_PROBES = {
+    "ollama": "http://localhost:11434/api/tags",
+}
+
+# TCP connect timeout used to rule out a local service before an HTTP probe
+_PORT_PROBE_TIMEOUT = 0.2
+
+# Key of a KEY=value assignment line in a .env file
+_ENV_KEY_RE = re.compile(rb"^\s*([A-Za-z_][A-Za-z0-9_]*)=")
+
+# Generator commands whose first argument is a model name
+_MODEL_COMMANDS = frozenset({"make:model", "make:resource"})
 
 # Commands that are handled by fastpy CLI itself (not proxied to project cli.py)
-FASTPY_COMMANDS = {
-    "new",
-    "version",
-    "docs",
-    "upgrade",
-    "ai",
-    "ai:config",
-    "config",
-    "doctor",
-    "init",
-    "install",
-    "libs",
-    "setup",
-    "setup:env",
-    "setup:db",
-    "setup:secret",
-    "setup:hooks",
-    "shell:install",
-    "--help",
-    "-h",
-    "--version",
-    "-v",
-    "--verbose",
-    "--debug",
-}
+FASTPY_COMMANDS: frozenset[str] = frozenset(
+    {
+        "new",
+        "version",
+        "docs",
+        "upgrade",
+        "ai",
+        "ai:config",
+        "config",
+        "doctor",
+        "init",
+        "install",
+        "libs",
+        "setup",
+        "setup:env",
+        "setup:db",
+        "setup:secret",
+        "setup:hooks",
+        "shell:install",
+        "--help",
+        "-h",
+        "--version",
+        "-v",
+        "--verbose",
+        "--debug",
+    }
+)
 
 # Available libs for scaffolding
-AVAILABLE_LIBS = {
+_LIBS = {
     "http": {
         "name": "Http",
         "description": "HTTP client facade (GET, POST, PUT, DELETE, etc.)",
-        "dependencies": ["httpx"],
+        "dependencies": ("httpx",),
     },
     "mail": {
         "name": "Mail",
         "description": "Email sending with multiple drivers (SMTP, SendGrid, Mailgun, SES)",
-        "dependencies": [],
+        "dependencies": (),
     },
     "cache": {
         "name": "Cache",
         "description": "Caching with multiple drivers (Memory, File, Redis)",
-        "dependencies": [],
+        "dependencies": (),
     },
     "storage": {
         "name": "Storage",
         "description": "File storage with multiple drivers (Local, S3, Memory)",
-        "dependencies": [],
+        "dependencies": (),
     },
     "queue": {
         "name": "Queue",
         "description": "Job queueing system with multiple drivers (Sync, Memory, Redis)",
-        "dependencies": [],
+        "dependencies": (),
     },
     "events": {
         "name": "Event",
         "description": "Event dispatcher with listeners and subscribers",
-        "dependencies": [],
+        "dependencies": (),
     },
     "notifications": {
         "name": "Notify",
         "description": "Multi-channel notifications (Mail, Database, Slack, SMS)",
-        "dependencies": [],
+        "dependencies": (),
     },
     "hash": {
         "name": "Hash",
         "description": "Password hashing (bcrypt, argon2, sha256)",
-        "dependencies": ["bcrypt"],
+        "dependencies": ("bcrypt",),
     },
     "crypt": {
         "name": "Crypt",
         "description": "Data encryption (Fernet, AES-256-CBC)",
-        "dependencies": ["cryptography"],
+        "dependencies": ("cryptography",),
     },
 }
 
+# Read-only view so command code can't mutate the shared lib metadata
+AVAILABLE_LIBS: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {key: MappingProxyType(lib) for key, lib in _LIBS.items()}
+)
+
+# Pre-rendered `fastpy libs --list` rows: (lib, facade, description, dependencies)
+_LIB_ROWS: tuple[tuple[str, str, str, str], ...] = tuple(
+    (key, lib["name"], lib["description"], ", ".join(lib["dependencies"]) or "-")
+    for key, lib in _LIBS.items()
+)
+
+# AI provider metadata for ai:config: API key variable, where to get a key,
+# and the matching `fastpy ai:init` target
+_PROVIDER_INFO: Mapping[str, Mapping[str, Optional[str]]] = MappingProxyType(
+    {
+        "anthropic": MappingProxyType(
+            {
+                "env_var": "ANTHROPIC_API_KEY",
+                "key_url": "https://console.anthropic.com",
+                "ai_init": "claude",
+            }
+        ),
+        "openai": MappingProxyType(
+            {
+                "env_var": "OPENAI_API_KEY",
+                "key_url": "https://platform.openai.com/api-keys",
+                "ai_init": None,
+            }
+        ),
+        "google": MappingProxyType(
+            {
+                "env_var": "GOOGLE_API_KEY",
+                "key_url": "https://aistudio.google.com/apikey",
+                "ai_init": "gemini",
+            }
+        ),
+        "groq": MappingProxyType(
+            {
+                "env_var": "GROQ_API_KEY",
+                "key_url": "https://console.groq.com/keys",
+                "ai_init": None,
+            }
+        ),
+        "ollama": MappingProxyType(
+            {
+                "env_var": None,
+                "key_url": None,
+                "ai_init": None,
+            }
+        ),
+    }
+)
+
+# Provider name -> API key environment variable (providers that need a key)
+_PROVIDER_ENV: Mapping[str, str] = MappingProxyType(
+    {name: info["env_var"] for name, info in _PROVIDER_INFO.items() if info["env_var"]}
+)
+
+# Default model shown per provider in the interactive ai:config status table
+_PROVIDER_MODEL: Mapping[str, str] = MappingProxyType(
+    {
+        "anthropic": "Claude Sonnet",
+        "openai": "GPT-4o",
+        "ollama": "Llama 3.2 (local)",
+    }
+)
+
+# Explanations for ai:config --test HTTP errors; {provider}, {key_url} and
+# {billing_url} are filled in per provider
+_API_ERROR_TEMPLATES: Mapping[int, tuple[str, str]] = MappingProxyType(
+    {
+        401: (
+            "Invalid API key",
+            "Your {provider} API key is invalid or has been revoked.\n"
+            "  Get a new key at: {key_url}",
+        ),
+        403: (
+            "Access forbidden",
+            "Your API key doesn't have permission for this operation.\n"
+            "  Check your account permissions and API key scopes.",
+        ),
+        429: (
+            "Rate limit exceeded",
+            "You've hit the API rate limit. This usually means:\n"
+            "  • You've exceeded your quota or credit limit\n"
+            "  • Too many requests in a short period\n"
+            "  Check your usage at: {billing_url}",
+        ),
+        500: (
+            "Server error",
+            "{provider} is experiencing issues. Try again in a few minutes.",
+        ),
+        502: (
+            "Bad gateway",
+            "{provider} service is temporarily unavailable. Try again shortly.",
+        ),
+        503: (
+            "Service unavailable",
+            "{provider} is under maintenance or overloaded. Try again later.",
+        ),
+    }
+)
+
+# Provider display name -> (API key URL, billing/usage URL)
+_API_ERROR_URLS: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        "Anthropic": (
+            "https://console.anthropic.com",
+            "https://console.anthropic.com/settings/billing",
+        ),
+        "OpenAI": (
+            "https://platform.openai.com/api-keys",
+            "https://platform.openai.com/usage",
+        ),
+    }
+)
+
 
 def version_callback(value: bool) -> None:
     """Print version and exit."""
@@ -167,40 +354,60 @@ def is_fastpy_project() -> bool:
     - Either requirements.txt or pyproject.toml (dependencies)
     - cli.py (project CLI, optional but recommended)
     """
-    project_path = Path.cwd()
+    return _is_fastpy_project(os.fspath(Path.cwd()))
+
 
-    # Check for core project files
-    has_main = (project_path / "main.py").exists()
-    has_app_dir = (project_path / "app").is_dir()
-    has_deps = (project_path / "requirements.txt").exists() or (project_path / "pyproject.toml").exists()
-    has_cli = (project_path / "cli.py").exists()
+@functools.lru_cache(maxsize=1)
+def _is_fastpy_project(cwd: str) -> bool:
+    """Check the project layout of ``cwd``, cached per working directory."""
+    project_path = Path(cwd)
 
     # Core requirements: main.py + app/ + dependencies
-    if has_main and has_app_dir and has_deps:
+    # Each check short-circuits, so a non-project directory costs two stats, not five
+    if (
+        (project_path / "main.py").exists()
+        and (project_path / "app").is_dir()
+        and (
+            (project_path / "requirements.txt").exists()
+            or (project_path / "pyproject.toml").exists()
+        )
+    ):
         return True
 
     # Also accept if cli.py exists (legacy detection)
-    if has_cli:
-        return True
-
-    return False
+    return (project_path / "cli.py").exists()
 
 
 def get_venv_paths() -> tuple[Optional[Path], Optional[Path]]:
     """Get venv python and bin paths if they exist."""
-    project_path = Path.cwd()
-    if sys.platform == "win32":
-        venv_python = project_path / "venv" / "Scripts" / "python.exe"
-        venv_bin = project_path / "venv" / "Scripts"
-    else:
-        venv_python = project_path / "venv" / "bin" / "python"
-        venv_bin = project_path / "venv" / "bin"
+    return _get_venv_paths(os.fspath(Path.cwd()))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_venv_paths(cwd: str) -> tuple[Optional[Path], Optional[Path]]:
+    """Resolve the venv paths of ``cwd``, cached per working directory."""
+    project_path = Path(cwd)
+    venv_python = project_path / _VENV_PY_REL
+    venv_bin = project_path / _VENV_BIN_REL
 
     if venv_python.exists():
         return venv_python, venv_bin
     return None, None
 
 
+def _detect_venv(project_path: Path) -> tuple[bool, Optional[Path]]:
+    """Probe a project's venv layout, skipping the interpreter check when there's no venv.
+
+    Returns:
+        Tuple of (venv directory exists, venv python path if it exists)
+    """
+    venv_dir = project_path / "venv"
+    if not os.path.isdir(venv_dir):
+        return False, None
+    venv_python = project_path / _VENV_PY_REL
+    return True, venv_python if os.path.isfile(venv_python) else None
+
+
 def is_venv_active() -> bool:
     """Check if we're running inside the project's venv."""
     venv_path = Path.cwd() / "venv"
@@ -220,17 +427,23 @@ def show_venv_hint(command: str = "") -> None:
     console.print("[yellow]The virtual environment is not activated.[/yellow]")
     console.print()
     console.print("[bold]To activate:[/bold]")
-    if sys.platform == "win32":
-        console.print("  [cyan]venv\\Scripts\\activate[/cyan]")
-    else:
-        console.print("  [cyan]source venv/bin/activate[/cyan]")
+    console.print(f"  [cyan]{_VENV_ACTIVATE}[/cyan]")
     if command:
         console.print()
         console.print(f"Then run: [cyan]fastpy {command}[/cyan]")
 
 
-def proxy_to_project_cli(args: list[str]) -> int:
-    """Proxy command to project's cli.py."""
+def proxy_to_project_cli(args: list[str], replace: bool = False) -> int:
+    """Proxy command to project's cli.py.
+
+    Args:
+        args: Arguments for the project CLI
+        replace: Replace this process with the project CLI instead of waiting
+            on a child process (POSIX only; Windows always runs a child)
+
+    Returns:
+        The project CLI's exit code
+    """
     cli_py = Path.cwd() / "cli.py"
 
     # Get venv paths
@@ -247,12 +460,13 @@ def proxy_to_project_cli(args: list[str]) -> int:
         console.print("[dim]This will create the venv and install dependencies.[/dim]")
         return 1
 
-    python_cmd = str(venv_python)
+    python_cmd = os.fspath(venv_python)
+    venv_bin_path = os.fspath(venv_bin)
     # Set PATH to include venv bin directory so subprocesses find uvicorn, etc.
     env = os.environ.copy()
-    env["PATH"] = f"{venv_bin}{os.pathsep}{env.get('PATH', '')}"
+    env["PATH"] = f"{venv_bin_path}{os.pathsep}{env.get('PATH', '')}"
     # Also set VIRTUAL_ENV for tools that check it
-    env["VIRTUAL_ENV"] = str(Path.cwd() / "venv")
+    env["VIRTUAL_ENV"] = os.path.dirname(venv_bin_path)
 
     # Quick check: verify cli.py can be imported (catches missing dependencies)
     check_cmd = [python_cmd, "-c", "import sys; sys.path.insert(0, '.'); import cli"]
@@ -273,10 +487,15 @@ def proxy_to_project_cli(args: list[str]) -> int:
             return 1
 
     # Run the actual command (without capturing, for real-time output)
-    cmd = [python_cmd, str(cli_py)] + args
+    cmd = [python_cmd, os.fspath(cli_py)] + args
     log_debug(f"Proxying to project CLI: {cmd}")
 
     try:
+        if replace and not _IS_WIN:
+            # Nothing runs after exec, so flush whatever is still buffered
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execve(python_cmd, cmd, env)
         result = subprocess.run(cmd, env=env)
         return result.returncode
 
@@ -289,10 +508,20 @@ def proxy_to_project_cli(args: list[str]) -> int:
 
 
 def run_command(
-    cmd: list, cwd: Optional[Path] = None, capture: bool = False
+    cmd: list, cwd: Optional[Path] = None, capture: bool = False, discard: bool = False
 ) -> subprocess.CompletedProcess:
-    """Run a shell command."""
+    """Run a shell command.
+
+    Args:
+        cmd: Command and arguments
+        cwd: Working directory for the command
+        capture: Capture stdout and stderr as text
+        discard: Send stdout and stderr to the null device, for callers that
+            only check the return code
+    """
     log_debug(f"Running command: {cmd}")
+    if discard:
+        return subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     return subprocess.run(
         cmd,
         cwd=cwd,
@@ -301,10 +530,213 @@ def run_command(
     )
 
 
+def _requirement_name(spec: str) -> Optional[str]:
+    """Extract the normalized project name from a requirement specifier."""
+    match = _REQUIREMENT_NAME_RE.match(spec.strip())
+    if not match:
+        return None
+    return re.sub(r"[-_.]+", "-", match.group(0)).lower()
+
+
+def _requirement_entries(text: str) -> Iterator[tuple[str, list[str]]]:
+    """Split requirements-file text into logical lines, the way pip reads them.
+
+    Backslash continuations are joined first, then comments are stripped.
+
+    Yields:
+        Tuples of (logical line without comments, physical lines it spans)
+    """
+    physical: list[str] = []
+    joined: list[str] = []
+    for line in text.splitlines():
+        physical.append(line)
+        if _REQ_COMMENT_RE.match(line):
+            # A comment line ends any continuation, like it does for pip
+            joined.append(" " + line)
+        elif line.endswith("\\"):
+            joined.append(line[:-1])
+            continue
+        else:
+            joined.append(line)
+        yield _REQ_COMMENT_RE.sub("", "".join(joined)).strip(), physical
+        physical, joined = [], []
+    if physical:
+        yield _REQ_COMMENT_RE.sub("", "".join(joined)).strip(), physical
+
+
+def read_requirements(
+    requirements_file: Path, exclude: Optional[re.Pattern[str]] = None
+) -> list[str]:
+    """Read the requirement lines of a requirements file.
+
+    Args:
+        requirements_file: Path to the requirements file
+        exclude: Pattern matching requirement lines to drop
+
+    Returns:
+        Non-empty lines with continuations joined and comments removed
+    """
+    return [
+        line
+        for line, _ in _requirement_entries(requirements_file.read_text())
+        if line and not (exclude and exclude.match(line))
+    ]
+
+
+@contextlib.contextmanager
+def filtered_requirements_file(
+    requirements_file: Path, exclude: re.Pattern[str]
+) -> Iterator[Path]:
+    """Write a copy of a requirements file without the requirements matching ``exclude``.
+
+    Every other line is copied as written, so pip parses the copy like the
+    original. The copy sits next to the original, so relative ``-r`` and ``-c``
+    includes still resolve, and it is deleted on exit.
+
+    Args:
+        requirements_file: Path to the requirements file
+        exclude: Pattern matching requirement lines to drop
+
+    Yields:
+        Path of the filtered copy
+    """
+    import tempfile
+
+    kept = [
+        physical_line
+        for line, physical in _requirement_entries(requirements_file.read_text())
+        if not (line and exclude.match(line))
+        for physical_line in physical
+    ]
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=".fastpy-requirements-", suffix=".txt", dir=requirements_file.parent
+    )
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(kept) + "\n")
+        yield tmp_path
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def pip_install_requirements(
+    python_cmd: str,
+    requirements_file: Path,
+    cwd: Optional[Path] = None,
+    env: Optional[dict] = None,
+    extra_requirements: Sequence[str] = (),
+    progress: Optional["Progress"] = None,
+) -> subprocess.CompletedProcess:
+    """Install a requirements file with pip, showing a real progress bar.
+
+    pip's own progress bar is disabled and its "Collecting ..." /
+    "Requirement already satisfied: ..." lines are streamed instead, advancing
+    the bar once per top-level requirement.
+
+    Args:
+        python_cmd: Python interpreter to run pip with
+        requirements_file: Requirements file to install
+        cwd: Working directory for pip
+        env: Environment for pip
+        extra_requirements: Requirement specifiers installed in the same run,
+            passed to pip after ``-r requirements_file``
+        progress: Running progress display to add the install task to; the
+            task is removed again when pip finishes
+
+    Returns:
+        CompletedProcess with the captured stdout and stderr
+    """
+    from rich.progress import BarColumn, Progress, TextColumn
+
+    pending = set()
+    for line in (*read_requirements(requirements_file), *extra_requirements):
+        if not line.startswith("-"):
+            name = _requirement_name(line)
+            if name:
+                pending.add(name)
+    total = len(pending)
+
+    cmd = [
+        python_cmd,
+        "-m",
+        "pip",
+        "install",
+        "--progress-bar",
+        "off",
+        "--no-color",
+        "-r",
+        os.fspath(requirements_file),
+        *extra_requirements,
+    ]
+    log_debug(f"Running command: {cmd}")
+
+    # Reuse the caller's live display when given one, otherwise run our own
+    owns_progress = progress is None
+    if owns_progress:
+        progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console,
+            auto_refresh=console.is_terminal,
+        )
+
+    with progress if owns_progress else contextlib.nullcontext():
+        task = progress.add_task("Installing packages...", total=total or None)
+        process = subprocess.Popen(
+            cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+
+        # Drain stderr in the background so a chatty build can't fill the pipe,
+        # keeping only a bounded tail and any MySQL build errors seen on the way
+        stderr_tail: deque[str] = deque(maxlen=_PIP_STDERR_TAIL_LINES)
+        mysql_lines: list[str] = []
+
+        def drain_stderr() -> None:
+            for err_line in process.stderr:
+                stderr_tail.append(err_line)
+                if len(mysql_lines) < _PIP_STDERR_MYSQL_LINES and _MYSQL_ERR_RE.search(err_line):
+                    mysql_lines.append(err_line)
+
+        drain = threading.Thread(target=drain_stderr, daemon=True)
+        drain.start()
+
+        stdout_lines = []
+        for line in process.stdout:
+            stdout_lines.append(line)
+            for prefix in _PIP_PROGRESS_PREFIXES:
+                if line.startswith(prefix):
+                    name = _requirement_name(line[len(prefix):])
+                    if name in pending:
+                        pending.discard(name)
+                        progress.advance(task)
+                    break
+
+        returncode = process.wait()
+        drain.join()
+        if owns_progress:
+            progress.update(task, completed=total, description="Done!")
+        else:
+            progress.remove_task(task)
+
+    stderr = "".join(stderr_tail)
+    if mysql_lines and not _MYSQL_ERR_RE.search(stderr):
+        # The MySQL errors scrolled out of the tail; keep them for diagnosis
+        stderr = "".join(mysql_lines) + "...\n" + stderr
+    return subprocess.CompletedProcess(cmd, returncode, "".join(stdout_lines), stderr)
+
+
+@functools.lru_cache(maxsize=1)
 def check_git_installed() -> bool:
     """Check if git is installed."""
     try:
-        subprocess.run(["git", "--version"], capture_output=True, check=True)
+        subprocess.run(
+            ["git", "--version"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
@@ -318,8 +750,20 @@ def clone_repository(project_name: str, branch: str = "main") -> tuple[bool, str
     """
     project_path = Path.cwd() / project_name
 
+    # Only the files at the branch tip are needed; the history is removed afterwards
     result = run_command(
-        ["git", "clone", "--depth", "1", "-b", branch, REPO_URL, project_name],
+        [
+            "git",
+            "clone",
+            "--depth",
+            "1",
+            "--single-branch",
+            "--no-tags",
+            "-b",
+            branch,
+            REPO_URL,
+            project_name,
+        ],
         capture=True,
     )
 
@@ -349,20 +793,48 @@ def clone_repository(project_name: str, branch: str = "main") -> tuple[bool, str
 
 def remove_git_history(project_path: Path) -> None:
     """Remove .git directory to start fresh."""
-    git_dir = project_path / ".git"
-    if git_dir.exists():
-        shutil.rmtree(git_dir)
+    # A fresh clone always has .git, so skip the separate existence check
+    with contextlib.suppress(FileNotFoundError):
+        shutil.rmtree(project_path / ".git")
+
+
+# Commands for a fresh repository when dulwich isn't available
+_GIT_INIT_COMMANDS = (
+    ("git", "init", "-q"),
+    ("git", "add", "-A"),
+    ("git", "commit", "-q", "-m", "Initial commit from Fastpy"),
+)
 
 
 def init_git_repo(project_path: Path) -> None:
-    """Initialize a fresh git repository."""
-    run_command(["git", "init"], cwd=project_path, capture=True)
-    run_command(["git", "add", "."], cwd=project_path, capture=True)
-    run_command(
-        ["git", "commit", "-m", "Initial commit from Fastpy"],
-        cwd=project_path,
-        capture=True,
-    )
+    """Initialize a fresh git repository.
+
+    Uses dulwich to write the initial commit in-process when it is installed,
+    falling back to the git CLI otherwise.
+    """
+    try:
+        from dulwich import porcelain
+    except ImportError:
+        porcelain = None
+
+    if porcelain is not None:
+        try:
+            repo = porcelain.init(project_path)
+            try:
+                porcelain.add(repo, paths=[project_path])
+                porcelain.commit(repo, message=b"Initial commit from Fastpy")
+            finally:
+                repo.close()
+            return
+        except Exception as e:
+            log_debug(f"dulwich commit failed, falling back to git: {e}")
+            # Don't let the git CLI build on a half-written .git
+            remove_git_history(project_path)
+
+    # Chain like `git init && git add && git commit`, without going through a shell
+    for cmd in _GIT_INIT_COMMANDS:
+        if run_command(list(cmd), cwd=project_path, discard=True).returncode != 0:
+            break
 
 
 @app.command()
@@ -386,6 +858,8 @@ def new(
         fastpy new my-api --no-install # Create project only, manual setup later
         fastpy new my-api --branch dev
     """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
     log_info(f"Creating new project: {project_name}")
 
     project_path = Path.cwd() / project_name
@@ -414,6 +888,7 @@ def new(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
+        auto_refresh=console.is_terminal,
     ) as progress:
         task = progress.add_task("Cloning Fastpy template...", total=None)
 
@@ -458,6 +933,7 @@ def new(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 console=console,
+                auto_refresh=console.is_terminal,
             ) as progress:
                 task = progress.add_task("Creating venv...", total=None)
                 result = run_command([sys.executable, "-m", "venv", "venv"], cwd=project_path)
@@ -467,102 +943,68 @@ def new(
                 progress.update(task, description="Done!")
             console.print("[green]✓[/green] Virtual environment created")
 
-            # Determine venv python path
-            if sys.platform == "win32":
-                venv_python = project_path / "venv" / "Scripts" / "python.exe"
-            else:
-                venv_python = project_path / "venv" / "bin" / "python"
-
-            python_cmd = str(venv_python)
+            python_cmd = os.fspath(project_path / _VENV_PY_REL)
 
             # Upgrade pip
             console.print("[blue]Upgrading pip...[/blue]")
-            subprocess.run(
+            run_command(
                 [python_cmd, "-m", "pip", "install", "--upgrade", "pip"],
                 cwd=project_path,
-                capture_output=True,
+                discard=True,
             )
             console.print("[green]✓[/green] pip upgraded")
 
-            # Install requirements with auto MySQL client installation on macOS
+            # Install requirements in a single pip run. On macOS, mysqlclient can't
+            # build without mysql_config, so offer the MySQL client up front
             requirements_path = project_path / "requirements.txt"
-            mysql_packages = ["mysqlclient", "pymysql", "aiomysql"]
-            max_attempts = 2
-
-            for attempt in range(max_attempts):
-                if not requirements_path.exists():
-                    break
+            if requirements_path.exists():
+                skip_mysql = False
+                if (
+                    _IS_MAC
+                    and shutil.which("mysql_config") is None
+                    and _MYSQLCLIENT_REQ_RE.search(requirements_path.read_text())
+                ):
+                    console.print(
+                        "[yellow]⚠[/yellow] MySQL client libraries not found (mysql_config)."
+                    )
+                    if typer.confirm("Auto-install MySQL client via Homebrew?", default=True):
+                        if not install_mysql_client_macos():
+                            console.print(
+                                "[yellow]Auto-install failed. "
+                                "Continuing without MySQL packages...[/yellow]"
+                            )
+                            skip_mysql = True
+                    else:
+                        console.print("[dim]Skipping MySQL packages...[/dim]")
+                        skip_mysql = True
+                    console.print()
 
-                if attempt == 0:
-                    console.print("[blue]Installing dependencies...[/blue]")
-                else:
-                    console.print("[blue]Retrying dependency installation...[/blue]")
-
-                pip_env = os.environ.copy()
-
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console,
-                ) as progress:
-                    task = progress.add_task("Installing packages...", total=None)
-                    result = subprocess.run(
-                        [python_cmd, "-m", "pip", "install", "-r", "requirements.txt"],
+                console.print("[blue]Installing dependencies...[/blue]")
+                with (
+                    filtered_requirements_file(requirements_path, _MYSQL_REQ_RE)
+                    if skip_mysql
+                    else contextlib.nullcontext(requirements_path)
+                ) as install_file:
+                    result = pip_install_requirements(
+                        python_cmd,
+                        install_file,
                         cwd=project_path,
-                        capture_output=True,
-                        text=True,
-                        env=pip_env,
+                        env=os.environ.copy(),
                     )
-                    progress.update(task, description="Done!")
 
                 if result.returncode == 0:
-                    console.print("[green]✓[/green] Dependencies installed")
-                    break
-                else:
-                    # Check if it's a MySQL-related error
-                    stderr_lower = result.stderr.lower()
-                    is_mysql_error = any(
-                        x in stderr_lower
-                        for x in ["mysqlclient", "mysql_config", "mariadb_config", "mysql.h"]
-                    )
-
-                    if is_mysql_error and sys.platform == "darwin" and attempt == 0:
-                        console.print()
-                        console.print("[yellow]⚠[/yellow] MySQL client installation failed.")
-
-                        if typer.confirm("Auto-install MySQL client via Homebrew?", default=True):
-                            if install_mysql_client_macos():
-                                console.print()
-                                continue  # Retry
-                            else:
-                                console.print("[yellow]Auto-install failed. Continuing without MySQL packages...[/yellow]")
-                                # Continue without MySQL - install other deps
-                                with open(requirements_path, "r") as f:
-                                    req_lines = f.readlines()
-                                filtered_reqs = [
-                                    line.strip() for line in req_lines
-                                    if line.strip() and not line.startswith("#")
-                                    and not any(pkg in line.lower() for pkg in mysql_packages)
-                                ]
-                                import tempfile
-                                with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-                                    tmp.write("\n".join(filtered_reqs))
-                                    tmp_path = tmp.name
-                                subprocess.run([python_cmd, "-m", "pip", "install", "-r", tmp_path], cwd=project_path, capture_output=True)
-                                os.unlink(tmp_path)
-                                console.print("[green]✓[/green] Dependencies installed (without MySQL packages)")
-                                break
-                        else:
-                            console.print("[dim]Skipping MySQL packages...[/dim]")
-                            break
-                    elif is_mysql_error:
-                        console.print("[yellow]⚠[/yellow] MySQL installation failed. Continuing without MySQL packages.")
-                        console.print("[dim]Use 'fastpy install --skip-mysql' for SQLite/PostgreSQL only.[/dim]")
-                        break
+                    if skip_mysql:
+                        console.print(
+                            "[green]✓[/green] Dependencies installed (without MySQL packages)"
+                        )
                     else:
-                        console.print("[red]Error:[/red] Failed to install dependencies")
-                        console.print(f"[dim]{result.stderr[:500]}[/dim]")
-                        break
+                        console.print("[green]✓[/green] Dependencies installed")
+                elif _MYSQL_ERR_RE.search(result.stderr):
+                    console.print("[yellow]⚠[/yellow] MySQL installation failed. Continuing without MySQL packages.")
+                    console.print("[dim]Use 'fastpy install --skip-mysql' for SQLite/PostgreSQL only.[/dim]")
+                else:
+                    console.print("[red]Error:[/red] Failed to install dependencies")
+                    console.print(f"[dim]{result.stderr[:500]}[/dim]")
 
             # Run setup automatically
             console.print()
@@ -671,9 +1113,29 @@ def docs() -> None:
     console.print(f"[green]✓[/green] Opening documentation: {DOCS_URL}")
 
 
+def _latest_version() -> Optional[str]:
+    """Look up the latest released Fastpy CLI version on PyPI.
+
+    Returns:
+        The version string, or None if PyPI couldn't be reached or parsed
+    """
+    try:
+        response = _http_client().get(PYPI_JSON_URL, timeout=2.0)
+        response.raise_for_status()
+        return response.json()["info"]["version"]
+    except Exception as e:
+        log_debug(f"PyPI version check failed: {e}")
+        return None
+
+
 @app.command()
 def upgrade() -> None:
     """Upgrade Fastpy CLI to the latest version."""
+    # Skip pip's resolver run entirely when there is nothing newer
+    if _latest_version() == __version__:
+        console.print(f"[green]✓[/green] Fastpy CLI v{__version__} is already the latest version")
+        return
+
     console.print("Upgrading Fastpy CLI...")
     result = subprocess.run(
         [sys.executable, "-m", "pip", "install", "--upgrade", "fastpy-cli"],
@@ -781,34 +1243,24 @@ def ai(
 
                 console.print()
 
-        # Extract model names from executed commands for follow-up prompts
+        # Extract model names from executed commands for follow-up prompts, and
+        # collect make:model models (no routes, unlike make:resource) in the same pass
         model_names = []
-        for cmd in commands:
-            command = cmd.get("command", "")
-            # Extract model name from make:model or make:resource commands
-            if "make:model" in command or "make:resource" in command:
-                parts = command.split()
-                for i, part in enumerate(parts):
-                    if part in ("make:model", "make:resource") and i + 1 < len(parts):
-                        model_name = parts[i + 1]
-                        # Skip if it's a flag
-                        if not model_name.startswith("-"):
-                            model_names.append(model_name)
-                        break
-
-        # Prompt to add routes for models without routes
         models_without_routes = []
         for cmd in commands:
-            command = cmd.get("command", "")
-            # Check if make:model was used (no routes) vs make:resource (has routes)
-            if "make:model" in command and "make:route" not in command:
-                parts = command.split()
-                for i, part in enumerate(parts):
-                    if part == "make:model" and i + 1 < len(parts):
-                        model_name = parts[i + 1]
-                        if not model_name.startswith("-"):
+            try:
+                tokens = shlex.split(cmd.get("command", ""))
+            except ValueError:
+                continue
+            for i, token in enumerate(tokens[:-1]):
+                if token in _MODEL_COMMANDS:
+                    model_name = tokens[i + 1]
+                    # Skip if it's a flag
+                    if not model_name.startswith("-"):
+                        model_names.append(model_name)
+                        if token == "make:model" and "make:route" not in tokens:
                             models_without_routes.append(model_name)
-                        break
+                    break
 
         if models_without_routes:
             console.print()
@@ -882,14 +1334,10 @@ def config(
     console.print(f"  Max Retries: {cfg.ai_max_retries}")
 
     provider = cfg.ai_provider
-    if provider == "anthropic":
-        key = os.environ.get("ANTHROPIC_API_KEY", "")
-        status = "[green]Set[/green]" if key else "[red]Not set[/red]"
-        console.print(f"  ANTHROPIC_API_KEY: {status}")
-    elif provider == "openai":
-        key = os.environ.get("OPENAI_API_KEY", "")
-        status = "[green]Set[/green]" if key else "[red]Not set[/red]"
-        console.print(f"  OPENAI_API_KEY: {status}")
+    env_var = _PROVIDER_ENV.get(provider)
+    if env_var:
+        status = "[green]Set[/green]" if os.environ.get(env_var) else "[red]Not set[/red]"
+        console.print(f"  {env_var}: {status}")
     elif provider == "ollama":
         console.print(f"  Model: {cfg.get('ai', 'ollama_model', 'llama3.2')}")
         console.print(f"  Host: {cfg.get('ai', 'ollama_host', 'http://localhost:11434')}")
@@ -906,6 +1354,17 @@ def config(
         console.print("[dim]Run 'fastpy config --init' to create config file[/dim]")
 
 
+@functools.lru_cache(maxsize=1)
+def _http_client() -> "httpx.Client":
+    """Shared HTTP client so provider checks reuse keep-alive connections."""
+    import httpx
+
+    return httpx.Client(
+        headers={"User-Agent": f"fastpy-cli/{__version__}"},
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+    )
+
+
 def update_env_file(key: str, value: str, env_path: Path = Path(".env")) -> bool:
     """Update or add a key-value pair in the .env file.
 
@@ -918,30 +1377,45 @@ def update_env_file(key: str, value: str, env_path: Path = Path(".env")) -> bool
         True if successful, False otherwise
     """
     try:
-        lines = []
-        key_found = False
-
-        # Read existing file if it exists
-        if env_path.exists():
-            with open(env_path) as f:
-                for line in f:
-                    # Check if this line contains our key
-                    if line.strip().startswith(f"{key}="):
-                        lines.append(f"{key}={value}\n")
-                        key_found = True
-                    else:
-                        lines.append(line)
+        # Read existing file in one call if it exists
+        exists = env_path.exists()
+        data = env_path.read_bytes() if exists else b""
+        lines = data.splitlines(keepends=True)
+        key_bytes = key.encode()
+        new_line = f"{key}={value}\n".encode()
+
+        # Map each assigned key to the line(s) that set it; skipped entirely
+        # when the key doesn't occur anywhere in the file
+        index: dict[bytes, list[int]] = {}
+        if key_bytes + b"=" in data:
+            for i, line in enumerate(lines):
+                match = _ENV_KEY_RE.match(line)
+                if match:
+                    index.setdefault(match.group(1), []).append(i)
+
+        for i in index.get(key_bytes, ()):
+            lines[i] = new_line
 
         # Add key if not found
-        if not key_found:
+        if key_bytes not in index:
             # Add newline if file doesn't end with one
-            if lines and not lines[-1].endswith("\n"):
-                lines.append("\n")
-            lines.append(f"{key}={value}\n")
-
-        # Write back
-        with open(env_path, "w") as f:
-            f.writelines(lines)
+            if lines and not lines[-1].endswith(b"\n"):
+                lines.append(b"\n")
+            lines.append(new_line)
+
+        # Write to a sibling file and rename it over the original so an
+        # interrupted write never leaves a truncated .env behind. A symlinked
+        # .env is replaced at its target so the link itself survives
+        target = env_path.resolve() if env_path.is_symlink() else env_path
+        tmp_path = target.with_name(target.name + ".tmp")
+        try:
+            tmp_path.write_bytes(b"".join(lines))
+            if exists:
+                shutil.copymode(target, tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         return True
     except Exception as e:
@@ -980,8 +1454,6 @@ def ai_config_command(
         groq       - Groq Cloud (requires GROQ_API_KEY)
         ollama     - Local LLMs (free, no API key needed)
     """
-    import requests
-
     console.print()
     console.print(Panel.fit("[bold blue]AI Configuration[/bold blue]", border_style="blue"))
     console.print()
@@ -998,12 +1470,7 @@ def ai_config_command(
             console.print("[yellow]Note:[/yellow] Ollama doesn't require an API key")
         else:
             # Determine environment variable name
-            env_var = {
-                "anthropic": "ANTHROPIC_API_KEY",
-                "openai": "OPENAI_API_KEY",
-                "google": "GOOGLE_API_KEY",
-                "groq": "GROQ_API_KEY",
-            }.get(target_provider)
+            env_var = _PROVIDER_ENV.get(target_provider)
 
             if not env_var:
                 console.print(f"[red]Error:[/red] Unknown provider: {target_provider}")
@@ -1021,10 +1488,9 @@ def ai_config_command(
     # If provider specified, update config
     if provider:
         provider = provider.lower()
-        valid_providers = ["anthropic", "openai", "google", "groq", "ollama"]
-        if provider not in valid_providers:
+        if provider not in _PROVIDER_INFO:
             console.print(f"[red]Error:[/red] Unknown provider: {provider}")
-            console.print(f"[dim]Available: {', '.join(valid_providers)}[/dim]")
+            console.print(f"[dim]Available: {', '.join(_PROVIDER_INFO)}[/dim]")
             raise typer.Exit(1)
 
         # Update config file
@@ -1033,46 +1499,19 @@ def ai_config_command(
 
         import toml
 
-        config_data = toml.load(CONFIG_FILE)
+        config_data = load_config_file(CONFIG_FILE)
         if "ai" not in config_data:
             config_data["ai"] = {}
         config_data["ai"]["provider"] = provider
 
         with open(CONFIG_FILE, "w") as f:
             toml.dump(config_data, f)
+        clear_config_file_cache()
 
         console.print(f"[green]✓[/green] AI provider set to: [cyan]{provider}[/cyan]")
 
         # Provider-specific instructions
-        provider_info = {
-            "anthropic": {
-                "env_var": "ANTHROPIC_API_KEY",
-                "key_url": "https://console.anthropic.com",
-                "ai_init": "claude",
-            },
-            "openai": {
-                "env_var": "OPENAI_API_KEY",
-                "key_url": "https://platform.openai.com/api-keys",
-                "ai_init": None,
-            },
-            "google": {
-                "env_var": "GOOGLE_API_KEY",
-                "key_url": "https://aistudio.google.com/apikey",
-                "ai_init": "gemini",
-            },
-            "groq": {
-                "env_var": "GROQ_API_KEY",
-                "key_url": "https://console.groq.com/keys",
-                "ai_init": None,
-            },
-            "ollama": {
-                "env_var": None,
-                "key_url": None,
-                "ai_init": None,
-            },
-        }
-
-        info = provider_info.get(provider, {})
+        info = _PROVIDER_INFO[provider]
 
         # Show next steps only if key wasn't just set
         if not key:
@@ -1106,54 +1545,24 @@ def ai_config_command(
 
     # Test connection
     if test:
+        import httpx
+
         current_provider = cfg.ai_provider
         console.print(f"Testing [cyan]{current_provider}[/cyan] connection...")
         console.print()
 
         def handle_api_error(
-            status_code: int, response: "requests.Response", provider: str
+            status_code: int, response: httpx.Response, provider: str
         ) -> None:
             """Display user-friendly error messages for API errors."""
-            error_messages = {
-                401: (
-                    "Invalid API key",
-                    f"Your {provider} API key is invalid or has been revoked.\n"
-                    f"  Get a new key at: {'https://console.anthropic.com' if provider == 'Anthropic' else 'https://platform.openai.com/api-keys'}",
-                ),
-                403: (
-                    "Access forbidden",
-                    "Your API key doesn't have permission for this operation.\n"
-                    "  Check your account permissions and API key scopes.",
-                ),
-                429: (
-                    "Rate limit exceeded",
-                    "You've hit the API rate limit. This usually means:\n"
-                    "  • You've exceeded your quota or credit limit\n"
-                    "  • Too many requests in a short period\n"
-                    f"  Check your usage at: {'https://console.anthropic.com/settings/billing' if provider == 'Anthropic' else 'https://platform.openai.com/usage'}",
-                ),
-                500: (
-                    "Server error",
-                    f"{provider} is experiencing issues. Try again in a few minutes.",
-                ),
-                502: (
-                    "Bad gateway",
-                    f"{provider} service is temporarily unavailable. Try again shortly.",
-                ),
-                503: (
-                    "Service unavailable",
-                    f"{provider} is under maintenance or overloaded. Try again later.",
-                ),
-            }
-
-            title, message = error_messages.get(
-                status_code, ("Unknown error", f"Unexpected error from {provider} API.")
+            key_url, billing_url = _API_ERROR_URLS.get(provider, _API_ERROR_URLS["OpenAI"])
+            title, template = _API_ERROR_TEMPLATES.get(
+                status_code, ("Unknown error", "Unexpected error from {provider} API.")
             )
+            message = template.format(provider=provider, key_url=key_url, billing_url=billing_url)
 
-            console.print(f"[red]✗[/red] {title} (HTTP {status_code})")
-            console.print()
-            for line in message.split("\n"):
-                console.print(f"[dim]{line}[/dim]")
+            lines = "\n".join(f"[dim]{line}[/dim]" for line in message.split("\n"))
+            console.print(f"[red]✗[/red] {title} (HTTP {status_code})\n\n{lines}")
 
             # Try to get more details from response
             try:
@@ -1177,7 +1586,7 @@ def ai_config_command(
                 console.print("[dim]Set with: fastpy ai:config -k YOUR_KEY[/dim]")
                 raise typer.Exit(1)
             try:
-                response = requests.post(
+                response = _http_client().post(
                     "https://api.anthropic.com/v1/messages",
                     headers={
                         "x-api-key": key,
@@ -1195,10 +1604,10 @@ def ai_config_command(
                     console.print("[green]✓[/green] Anthropic connection successful!")
                 else:
                     handle_api_error(response.status_code, response, "Anthropic")
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 console.print("[red]✗[/red] Connection timed out")
                 console.print("[dim]The Anthropic API took too long to respond. Try again.[/dim]")
-            except requests.exceptions.ConnectionError:
+            except httpx.ConnectError:
                 console.print("[red]✗[/red] Connection failed")
                 console.print(
                     "[dim]Could not connect to Anthropic API. Check your internet connection.[/dim]"
@@ -1213,7 +1622,7 @@ def ai_config_command(
                 console.print("[dim]Set with: fastpy ai:config -k YOUR_KEY[/dim]")
                 raise typer.Exit(1)
             try:
-                response = requests.post(
+                response = _http_client().post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={
                         "Authorization": f"Bearer {key}",
@@ -1230,10 +1639,10 @@ def ai_config_command(
                     console.print("[green]✓[/green] OpenAI connection successful!")
                 else:
                     handle_api_error(response.status_code, response, "OpenAI")
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 console.print("[red]✗[/red] Connection timed out")
                 console.print("[dim]The OpenAI API took too long to respond. Try again.[/dim]")
-            except requests.exceptions.ConnectionError:
+            except httpx.ConnectError:
                 console.print("[red]✗[/red] Connection failed")
                 console.print(
                     "[dim]Could not connect to OpenAI API. Check your internet connection.[/dim]"
@@ -1244,7 +1653,7 @@ def ai_config_command(
         elif current_provider == "ollama":
             host = cfg.get("ai", "ollama_host", "http://localhost:11434")
             try:
-                response = requests.get(f"{host}/api/tags", timeout=5)
+                response = _http_client().get(f"{host}/api/tags", timeout=5)
                 if response.status_code == 200:
                     models = response.json().get("models", [])
                     console.print("[green]✓[/green] Ollama is running!")
@@ -1254,7 +1663,7 @@ def ai_config_command(
                         )
                 else:
                     console.print(f"[red]✗[/red] Ollama error: {response.status_code}")
-            except requests.exceptions.ConnectionError:
+            except httpx.ConnectError:
                 console.print("[red]✗[/red] Ollama is not running")
                 console.print("[dim]Start with: ollama serve[/dim]")
             except Exception as e:
@@ -1287,7 +1696,10 @@ def ai_config_command(
 
     # Check Ollama
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
+        ollama_url = LOCAL_SERVICE_PROBES["ollama"]
+        if not _port_open(ollama_url):
+            raise ConnectionRefusedError(ollama_url)
+        response = _http_client().get(ollama_url, timeout=1.0)
         if response.status_code == 200:
             providers_status.append(("ollama", "[green]✓[/green] Running locally"))
         else:
@@ -1297,18 +1709,15 @@ def ai_config_command(
 
     console.print()
     console.print("[bold]Available Providers[/bold]")
+    from rich.table import Table
+
     table = Table(show_header=True, header_style="bold")
     table.add_column("Provider")
     table.add_column("Model")
     table.add_column("Status")
 
     for name, status in providers_status:
-        model = {
-            "anthropic": "Claude Sonnet",
-            "openai": "GPT-4o",
-            "ollama": "Llama 3.2 (local)",
-        }[name]
-        table.add_row(name, model, status)
+        table.add_row(name, _PROVIDER_MODEL[name], status)
 
     console.print(table)
 
@@ -1333,6 +1742,86 @@ def ai_config_command(
     console.print("[dim]  Ollama: https://ollama.ai (free, runs locally)[/dim]")
 
 
+def _port_open(url: str, timeout: float = _PORT_PROBE_TIMEOUT) -> bool:
+    """Check whether anything is listening on the host and port of a URL."""
+    import socket
+
+    parts = urlsplit(url)
+    try:
+        socket.create_connection((parts.hostname, parts.port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+async def _probe_local_services(timeout: float = 2.0) -> dict[str, bool]:
+    """Probe local AI services concurrently.
+
+    Returns:
+        Mapping of service name to whether it answered with HTTP 200
+    """
+    import asyncio
+
+    import httpx
+
+    async def probe(client: "httpx.AsyncClient", url: str) -> bool:
+        # A closed port fails the TCP connect immediately; skip the HTTP request
+        parts = urlsplit(url)
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, parts.port), _PORT_PROBE_TIMEOUT
+            )
+            writer.close()
+            await writer.wait_closed()
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+        try:
+            response = await client.get(url)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        results = await asyncio.gather(
+            *(probe(client, url) for url in LOCAL_SERVICE_PROBES.values())
+        )
+    return dict(zip(LOCAL_SERVICE_PROBES, results))
+
+
+def _find_venv_modules(python_cmd: str, modules: list[str]) -> dict[str, bool]:
+    """Check which modules are importable by a venv interpreter in one subprocess.
+
+    Returns:
+        Mapping of module name to availability (all False if the check fails)
+    """
+    if not modules:
+        return {}
+
+    import json
+
+    code = (
+        "import importlib.util, json; "
+        f"print(json.dumps({{m: importlib.util.find_spec(m) is not None for m in {modules!r}}}))"
+    )
+    try:
+        result = subprocess.run([python_cmd, "-c", code], capture_output=True, text=True)
+        if result.returncode == 0:
+            return json.loads(result.stdout)
+    except (OSError, ValueError) as e:
+        log_debug(f"Venv module check failed: {e}")
+    return dict.fromkeys(modules, False)
+
+
+def _has_any_py(directory: Path) -> bool:
+    """Check whether a directory contains at least one .py file, stopping at the first."""
+    try:
+        with os.scandir(directory) as entries:
+            return any(e.name.endswith(".py") and e.is_file() for e in entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
 @app.command()
 def doctor() -> None:
     """Diagnose and fix common issues.
@@ -1345,213 +1834,204 @@ def doctor() -> None:
     - Project dependencies
     - Database connectivity
     """
-    console.print()
-    console.print(
-        Panel.fit(
-            "[bold blue]Fastpy Doctor[/bold blue]\n"
-            "[dim]Environment diagnostics[/dim]",
-            border_style="blue",
+    # Buffer the report and flush it to the terminal in a single write
+    with console:
+        console.print()
+        console.print(
+            Panel.fit(
+                "[bold blue]Fastpy Doctor[/bold blue]\n"
+                "[dim]Environment diagnostics[/dim]",
+                border_style="blue",
+            )
         )
-    )
-    console.print()
-
-    issues = []
-    warnings = []
-
-    # Python version check
-    console.print("[bold]System:[/bold]")
-    py_version = sys.version_info
-    py_status = "[green]✓[/green]" if py_version >= (3, 9) else "[red]✗[/red]"
-    console.print(f"  {py_status} Python {py_version.major}.{py_version.minor}.{py_version.micro}")
-    if py_version < (3, 9):
-        issues.append("Python 3.9 or higher is required")
-
-    # Git check
-    git_installed = check_git_installed()
-    git_status = "[green]✓[/green]" if git_installed else "[red]✗[/red]"
-    console.print(f"  {git_status} Git installed")
-    if not git_installed:
-        issues.append("Git is not installed. Install from https://git-scm.com")
-
-    # pip check
-    pip_works = False
-    try:
-        result = subprocess.run([sys.executable, "-m", "pip", "--version"], capture_output=True)
-        pip_works = result.returncode == 0
-    except Exception:
-        pass
-    pip_status = "[green]✓[/green]" if pip_works else "[red]✗[/red]"
-    console.print(f"  {pip_status} pip available")
-    if not pip_works:
-        issues.append("pip not available. Reinstall Python or run: python -m ensurepip")
-
-    # Config file check
-    config_exists = CONFIG_FILE.exists()
-    config_status = "[green]✓[/green]" if config_exists else "[yellow]○[/yellow]"
-    console.print(
-        f"  {config_status} Config file {'exists' if config_exists else 'not found (optional)'}"
-    )
-    if not config_exists:
-        warnings.append("No config file found. Run 'fastpy config --init' to create one")
-
-    # AI Provider checks
-    console.print()
-    console.print("[bold]AI Providers:[/bold]")
-
-    # Anthropic
-    anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
-    anthropic_status = "[green]✓[/green]" if anthropic_key else "[yellow]○[/yellow]"
-    console.print(f"  {anthropic_status} Anthropic (Claude)")
-
-    # OpenAI
-    openai_key = os.environ.get("OPENAI_API_KEY")
-    openai_status = "[green]✓[/green]" if openai_key else "[yellow]○[/yellow]"
-    console.print(f"  {openai_status} OpenAI (GPT)")
-
-    # Google
-    google_key = os.environ.get("GOOGLE_API_KEY")
-    google_status = "[green]✓[/green]" if google_key else "[yellow]○[/yellow]"
-    console.print(f"  {google_status} Google (Gemini)")
-
-    # Groq
-    groq_key = os.environ.get("GROQ_API_KEY")
-    groq_status = "[green]✓[/green]" if groq_key else "[yellow]○[/yellow]"
-    console.print(f"  {groq_status} Groq (Fast inference)")
-
-    # Ollama
-    ollama_running = False
-    try:
-        import httpx
+        console.print()
 
-        response = httpx.get("http://localhost:11434/api/tags", timeout=2.0)
-        ollama_running = response.status_code == 200
-    except Exception:
-        pass
-    ollama_status = "[green]✓[/green]" if ollama_running else "[yellow]○[/yellow]"
-    console.print(f"  {ollama_status} Ollama (Local)")
+        issues = []
+        warnings = []
 
-    # Check if at least one AI provider is available
-    has_ai = anthropic_key or openai_key or google_key or groq_key or ollama_running
-    if not has_ai:
-        warnings.append("No AI provider configured. Run 'fastpy ai:config' for options")
+        # Python version check
+        console.print("[bold]System:[/bold]")
+        py_version = sys.version_info
+        py_status = "[green]✓[/green]" if py_version >= (3, 9) else "[red]✗[/red]"
+        console.print(
+            f"  {py_status} Python {py_version.major}.{py_version.minor}.{py_version.micro}"
+        )
+        if py_version < (3, 9):
+            issues.append("Python 3.9 or higher is required")
+
+        # Git check
+        git_installed = check_git_installed()
+        git_status = "[green]✓[/green]" if git_installed else "[red]✗[/red]"
+        console.print(f"  {git_status} Git installed")
+        if not git_installed:
+            issues.append("Git is not installed. Install from https://git-scm.com")
+
+        # pip check
+        pip_works = importlib.util.find_spec("pip") is not None
+        pip_status = "[green]✓[/green]" if pip_works else "[red]✗[/red]"
+        console.print(f"  {pip_status} pip available")
+        if not pip_works:
+            issues.append("pip not available. Reinstall Python or run: python -m ensurepip")
+
+        # Config file check
+        config_exists = CONFIG_FILE.exists()
+        config_status = "[green]✓[/green]" if config_exists else "[yellow]○[/yellow]"
+        console.print(
+            f"  {config_status} Config file {'exists' if config_exists else 'not found (optional)'}"
+        )
+        if not config_exists:
+            warnings.append("No config file found. Run 'fastpy config --init' to create one")
 
-    # Project check (if in a project)
-    console.print()
-    console.print("[bold]Project Status:[/bold]")
-    if is_fastpy_project():
-        console.print("  [green]✓[/green] Inside a Fastpy project")
-
-        # Check venv
-        venv_path = Path.cwd() / "venv"
-        venv_python, venv_bin = get_venv_paths()
-        if venv_path.exists():
-            console.print("  [green]✓[/green] Virtual environment exists")
-
-            # Check if venv is active
-            current_python = Path(sys.executable).resolve()
-            if venv_python and current_python == venv_python.resolve():
-                console.print("  [green]✓[/green] Virtual environment is active")
-            else:
-                console.print("  [yellow]○[/yellow] Virtual environment not activated")
-                if sys.platform == "win32":
-                    warnings.append("Activate venv: venv\\Scripts\\activate")
+        # AI Provider checks
+        console.print()
+        console.print("[bold]AI Providers:[/bold]")
+
+        # Anthropic
+        anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
+        anthropic_status = "[green]✓[/green]" if anthropic_key else "[yellow]○[/yellow]"
+        console.print(f"  {anthropic_status} Anthropic (Claude)")
+
+        # OpenAI
+        openai_key = os.environ.get("OPENAI_API_KEY")
+        openai_status = "[green]✓[/green]" if openai_key else "[yellow]○[/yellow]"
+        console.print(f"  {openai_status} OpenAI (GPT)")
+
+        # Google
+        google_key = os.environ.get("GOOGLE_API_KEY")
+        google_status = "[green]✓[/green]" if google_key else "[yellow]○[/yellow]"
+        console.print(f"  {google_status} Google (Gemini)")
+
+        # Groq
+        groq_key = os.environ.get("GROQ_API_KEY")
+        groq_status = "[green]✓[/green]" if groq_key else "[yellow]○[/yellow]"
+        console.print(f"  {groq_status} Groq (Fast inference)")
+
+        # Ollama (local services are probed concurrently)
+        import asyncio
+
+        services = asyncio.run(_probe_local_services())
+        ollama_running = services["ollama"]
+        ollama_status = "[green]✓[/green]" if ollama_running else "[yellow]○[/yellow]"
+        console.print(f"  {ollama_status} Ollama (Local)")
+
+        # Check if at least one AI provider is available
+        has_ai = anthropic_key or openai_key or google_key or groq_key or ollama_running
+        if not has_ai:
+            warnings.append("No AI provider configured. Run 'fastpy ai:config' for options")
+
+        # Project check (if in a project)
+        console.print()
+        console.print("[bold]Project Status:[/bold]")
+        if is_fastpy_project():
+            console.print("  [green]✓[/green] Inside a Fastpy project")
+            cwd = Path.cwd()
+
+            # Check venv
+            venv_path = cwd / "venv"
+            venv_python, venv_bin = get_venv_paths()
+            if venv_path.exists():
+                console.print("  [green]✓[/green] Virtual environment exists")
+
+                # Check if venv is active
+                current_python = Path(sys.executable).resolve()
+                if venv_python and current_python == venv_python.resolve():
+                    console.print("  [green]✓[/green] Virtual environment is active")
                 else:
-                    warnings.append("Activate venv: source venv/bin/activate")
+                    console.print("  [yellow]○[/yellow] Virtual environment not activated")
+                    warnings.append(f"Activate venv: {_VENV_ACTIVATE}")
 
-            # Check key dependencies in venv
-            if venv_python:
-                console.print()
-                console.print("  [bold]Dependencies:[/bold]")
-                deps_to_check = ["uvicorn", "alembic", "fastapi", "sqlmodel"]
-                for dep in deps_to_check:
-                    dep_path = venv_bin / dep if venv_bin else None
-                    if dep_path and dep_path.exists():
-                        console.print(f"    [green]✓[/green] {dep}")
-                    else:
-                        # Check if installed as a package
-                        check_result = subprocess.run(
-                            [str(venv_python), "-c", f"import {dep.replace('-', '_')}"],
-                            capture_output=True,
-                        )
-                        if check_result.returncode == 0:
+                # Check key dependencies in venv
+                if venv_python:
+                    console.print()
+                    console.print("  [bold]Dependencies:[/bold]")
+                    deps_to_check = ["uvicorn", "alembic", "fastapi", "sqlmodel"]
+                    # Deps without a console script in venv/bin are checked as
+                    # importable packages in a single venv interpreter run
+                    unresolved = [
+                        dep for dep in deps_to_check if not (venv_bin and (venv_bin / dep).exists())
+                    ]
+                    importable = _find_venv_modules(
+                        os.fspath(venv_python), [dep.replace("-", "_") for dep in unresolved]
+                    )
+                    for dep in deps_to_check:
+                        if dep not in unresolved or importable.get(dep.replace("-", "_")):
                             console.print(f"    [green]✓[/green] {dep}")
                         else:
                             console.print(f"    [red]✗[/red] {dep}")
                             issues.append(f"Missing dependency: {dep}. Run: fastpy install")
-        else:
-            console.print("  [red]✗[/red] Virtual environment not found")
-            issues.append("Virtual environment not found. Run: fastpy install")
+            else:
+                console.print("  [red]✗[/red] Virtual environment not found")
+                issues.append("Virtual environment not found. Run: fastpy install")
 
-        # Check .env
-        console.print()
-        env_path = Path.cwd() / ".env"
-        if env_path.exists():
-            console.print("  [green]✓[/green] .env file exists")
+            # Check .env
+            console.print()
+            env_path = cwd / ".env"
+            if env_path.exists():
+                console.print("  [green]✓[/green] .env file exists")
 
-            # Check critical env vars
-            from fastpy_cli.setup import read_env
+                # Check critical env vars
+                from fastpy_cli.setup import read_env
 
-            env_vars = read_env()
-            db_url = env_vars.get("DATABASE_URL")
-            secret_key = env_vars.get("SECRET_KEY")
+                env_vars = read_env()
+                db_url = env_vars.get("DATABASE_URL")
+                secret_key = env_vars.get("SECRET_KEY")
 
-            if db_url:
-                console.print("  [green]✓[/green] DATABASE_URL configured")
-            else:
-                console.print("  [red]✗[/red] DATABASE_URL not set")
-                issues.append("DATABASE_URL not configured. Run: fastpy setup:db")
-
-            if secret_key and len(secret_key) >= 32:
-                console.print("  [green]✓[/green] SECRET_KEY configured")
-            elif secret_key:
-                console.print("  [yellow]○[/yellow] SECRET_KEY may be too short")
-                warnings.append("SECRET_KEY may be weak. Run: fastpy setup:secret")
+                if db_url:
+                    console.print("  [green]✓[/green] DATABASE_URL configured")
+                else:
+                    console.print("  [red]✗[/red] DATABASE_URL not set")
+                    issues.append("DATABASE_URL not configured. Run: fastpy setup:db")
+
+                if secret_key and len(secret_key) >= 32:
+                    console.print("  [green]✓[/green] SECRET_KEY configured")
+                elif secret_key:
+                    console.print("  [yellow]○[/yellow] SECRET_KEY may be too short")
+                    warnings.append("SECRET_KEY may be weak. Run: fastpy setup:secret")
+                else:
+                    console.print("  [red]✗[/red] SECRET_KEY not set")
+                    issues.append("SECRET_KEY not configured. Run: fastpy setup:secret")
             else:
-                console.print("  [red]✗[/red] SECRET_KEY not set")
-                issues.append("SECRET_KEY not configured. Run: fastpy setup:secret")
+                console.print("  [red]✗[/red] .env file not found")
+                issues.append(".env file not found. Run: fastpy setup:env")
+
+            # Check alembic/migrations
+            alembic_dir = cwd / "alembic"
+            if alembic_dir.exists():
+                if _has_any_py(alembic_dir / "versions"):
+                    console.print("  [green]✓[/green] Migrations exist")
+                else:
+                    console.print("  [yellow]○[/yellow] No migrations found")
+                    warnings.append("No migrations found. Run: fastpy db:migrate")
         else:
-            console.print("  [red]✗[/red] .env file not found")
-            issues.append(".env file not found. Run: fastpy setup:env")
-
-        # Check alembic/migrations
-        alembic_dir = Path.cwd() / "alembic"
-        if alembic_dir.exists():
-            versions_dir = alembic_dir / "versions"
-            has_migrations = versions_dir.exists() and any(versions_dir.glob("*.py"))
-            if has_migrations:
-                console.print("  [green]✓[/green] Migrations exist")
-            else:
-                console.print("  [yellow]○[/yellow] No migrations found")
-                warnings.append("No migrations found. Run: fastpy db:migrate")
-    else:
-        console.print("  [dim]Not inside a Fastpy project[/dim]")
-        console.print()
-        console.print("  [dim]Create a project with:[/dim]")
-        console.print("    [cyan]fastpy new my-api[/cyan]")
+            console.print("  [dim]Not inside a Fastpy project[/dim]")
+            console.print()
+            console.print("  [dim]Create a project with:[/dim]")
+            console.print("    [cyan]fastpy new my-api[/cyan]")
 
-    # Summary
-    console.print()
-    if issues:
-        console.print("[bold red]Issues found:[/bold red]")
-        for issue in issues:
-            console.print(f"  [red]•[/red] {issue}")
-    if warnings:
-        console.print("[bold yellow]Warnings:[/bold yellow]")
-        for warning in warnings:
-            console.print(f"  [yellow]•[/yellow] {warning}")
-
-    if not issues and not warnings:
-        console.print("[bold green]All checks passed![/bold green]")
+        # Summary
         console.print()
-        console.print("[dim]Your environment is ready to use Fastpy.[/dim]")
-    elif not issues:
-        console.print()
-        console.print("[green]No critical issues found.[/green]")
+        if issues:
+            console.print("[bold red]Issues found:[/bold red]")
+            for issue in issues:
+                console.print(f"  [red]•[/red] {issue}")
+        if warnings:
+            console.print("[bold yellow]Warnings:[/bold yellow]")
+            for warning in warnings:
+                console.print(f"  [yellow]•[/yellow] {warning}")
+
+        if not issues and not warnings:
+            console.print("[bold green]All checks passed![/bold green]")
+            console.print()
+            console.print("[dim]Your environment is ready to use Fastpy.[/dim]")
+        elif not issues:
+            console.print()
+            console.print("[green]No critical issues found.[/green]")
 
-    console.print()
-    console.print(f"[dim]Fastpy CLI v{__version__}[/dim]")
+        console.print()
+        console.print(f"[dim]Fastpy CLI v{__version__}[/dim]")
 
 
+@functools.lru_cache(maxsize=1)
 def check_brew_installed() -> bool:
     """Check if Homebrew is installed."""
     try:
@@ -1561,6 +2041,7 @@ def check_brew_installed() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def get_shell_config_path() -> Optional[Path]:
     """Get the path to the user's shell config file."""
     shell = os.environ.get("SHELL", "")
@@ -1577,16 +2058,26 @@ def get_shell_config_path() -> Optional[Path]:
     return None
 
 
+def _file_contains(path: Path, needle: bytes) -> bool:
+    """Check whether a file contains ``needle`` without reading it into memory.
+
+    Returns:
+        True if found, False if not found or the file is missing/unreadable
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(needle) != -1
+    except (OSError, ValueError):
+        # ValueError: empty files can't be mapped
+        return False
+
+
 def is_shell_integration_installed() -> bool:
     """Check if fastpy shell integration is installed."""
     shell_config = get_shell_config_path()
-    if not shell_config or not shell_config.exists():
-        return False
-    try:
-        content = shell_config.read_text()
-        return "# Fastpy Shell Integration" in content
-    except Exception:
+    if not shell_config:
         return False
+    return _file_contains(shell_config, _SHELL_INTEGRATION_MARKER)
 
 
 def install_mysql_client_macos() -> bool:
@@ -1594,6 +2085,8 @@ def install_mysql_client_macos() -> bool:
 
     Returns True if installation was successful.
     """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
     if not check_brew_installed():
         console.print("[yellow]⚠[/yellow] Homebrew not installed")
         console.print("[dim]Install from: https://brew.sh[/dim]")
@@ -1609,6 +2102,7 @@ def install_mysql_client_macos() -> bool:
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
+        auto_refresh=console.is_terminal,
     ) as progress:
         task = progress.add_task("Running brew install...", total=None)
         result = subprocess.run(
@@ -1642,10 +2136,16 @@ export LDFLAGS="-L{mysql_path}/lib"
 export CPPFLAGS="-I{mysql_path}/include"
 export PKG_CONFIG_PATH="{mysql_path}/lib/pkgconfig"
 '''
-        # Check if already configured
-        existing_content = shell_config.read_text() if shell_config.exists() else ""
-        if "mysql-client" not in existing_content and f"{mysql_path}/bin" not in existing_content:
-            with open(shell_config, "a") as f:
+        # Check if already configured (raw bytes, no need to decode the whole file)
+        try:
+            existing_content = shell_config.read_bytes()
+        except FileNotFoundError:
+            existing_content = b""
+        if (
+            b"mysql-client" not in existing_content
+            and f"{mysql_path}/bin".encode() not in existing_content
+        ):
+            with open(shell_config, "a", buffering=io.DEFAULT_BUFFER_SIZE) as f:
                 f.write(env_lines)
             console.print(f"[green]✓[/green] Environment variables added to {shell_config.name}")
         else:
@@ -1663,6 +2163,37 @@ export PKG_CONFIG_PATH="{mysql_path}/lib/pkgconfig"
     return False
 
 
+def _pip_version(python_cmd: str) -> Optional[tuple[int, int]]:
+    """Get the (major, minor) pip version of an interpreter without starting pip's CLI.
+
+    Returns:
+        Version tuple, or None if pip is missing or the version can't be read
+    """
+    try:
+        result = subprocess.run(
+            [python_cmd, "-c", "import pip; print(pip.__version__)"],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    match = _VERSION_RE.match(result.stdout.strip()) if result.returncode == 0 else None
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+# Static header panels, built once and rendered as-is
+_INSTALL_PANEL = Panel.fit(
+    "[bold blue]Fastpy Project Install[/bold blue]\n"
+    "[dim]Setting up your development environment[/dim]",
+    border_style="blue",
+)
+_SHELL_PANEL = Panel.fit(
+    "[bold blue]Shell Integration[/bold blue]\n"
+    "[dim]Global auto-activate for fastpy projects[/dim]",
+    border_style="blue",
+)
+
+
 @app.command("install")
 def install_command(
     skip_setup: bool = typer.Option(False, "--skip-setup", help="Skip running fastpy setup"),
@@ -1681,10 +2212,10 @@ def install_command(
     2. Installing dependencies from requirements.txt
     3. Running fastpy setup (interactive project configuration)
 
-    On macOS, if MySQL client installation fails, it will automatically:
+    On macOS, if the MySQL client libraries are missing, it will offer to:
     - Install mysql-client via Homebrew
     - Add environment variables to your shell config
-    - Retry the installation
+    before installing dependencies.
 
     This command should be run inside a Fastpy project directory.
 
@@ -1694,6 +2225,8 @@ def install_command(
         fastpy install --skip-mysql        # Skip MySQL packages (for SQLite users)
         fastpy install -r requirements-dev.txt  # Use different requirements file
     """
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn
+
     from fastpy_cli.setup import is_fastpy_project as check_project
 
     if not check_project():
@@ -1702,205 +2235,161 @@ def install_command(
         raise typer.Exit(1)
 
     console.print()
-    console.print(
-        Panel.fit(
-            "[bold blue]Fastpy Project Install[/bold blue]\n"
-            "[dim]Setting up your development environment[/dim]",
-            border_style="blue",
-        )
-    )
+    console.print(_INSTALL_PANEL)
     console.print()
 
     project_path = Path.cwd()
 
-    # Step 1: Create virtual environment
-    if not skip_venv:
-        venv_path = project_path / "venv"
-        if venv_path.exists():
-            console.print("[green]✓[/green] Virtual environment already exists")
-        else:
-            console.print("[blue]Creating virtual environment...[/blue]")
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("Creating venv...", total=None)
-                result = run_command([sys.executable, "-m", "venv", "venv"], cwd=project_path)
-                if result.returncode != 0:
-                    console.print("[red]Error:[/red] Failed to create virtual environment")
-                    raise typer.Exit(1)
-                progress.update(task, description="Done!")
-            console.print("[green]✓[/green] Virtual environment created")
-
-    # Determine venv python path
-    if sys.platform == "win32":
-        venv_python = project_path / "venv" / "Scripts" / "python.exe"
-        venv_pip = project_path / "venv" / "Scripts" / "pip.exe"
-    else:
-        venv_python = project_path / "venv" / "bin" / "python"
-        venv_pip = project_path / "venv" / "bin" / "pip"
-
-    # Use venv python if it exists, otherwise use current python
-    python_cmd = str(venv_python) if venv_python.exists() else sys.executable
-
-    # Step 2: Upgrade pip
-    console.print("[blue]Upgrading pip...[/blue]")
-    result = subprocess.run(
-        [python_cmd, "-m", "pip", "install", "--upgrade", "pip"],
-        cwd=project_path,
-        capture_output=True,
-    )
-    if result.returncode == 0:
-        console.print("[green]✓[/green] pip upgraded")
-    else:
-        console.print("[yellow]⚠[/yellow] Could not upgrade pip (continuing anyway)")
-
-    # Step 3: Install requirements (with auto-retry for MySQL on macOS)
     requirements_path = project_path / requirements
-    mysql_packages = ["mysqlclient", "pymysql", "aiomysql"]
-    max_attempts = 2  # Allow one retry after installing mysql-client
-
-    for attempt in range(max_attempts):
-        if not requirements_path.exists():
-            console.print(f"[yellow]⚠[/yellow] {requirements} not found, skipping dependency installation")
-            break
-
-        if skip_mysql:
-            console.print(
-                f"[blue]Installing dependencies from {requirements} (skipping MySQL packages)...[/blue]"
-            )
-            # Read requirements and filter out MySQL packages
-            with open(requirements_path, "r") as f:
-                req_lines = f.readlines()
-
-            filtered_reqs = []
-            for line in req_lines:
-                line_lower = line.lower().strip()
-                # Skip empty lines, comments, and MySQL packages
-                if not line_lower or line_lower.startswith("#"):
-                    continue
-                # Check if it's a MySQL package
-                is_mysql_pkg = any(pkg in line_lower for pkg in mysql_packages)
-                if not is_mysql_pkg:
-                    filtered_reqs.append(line.strip())
-
-            # Create a temporary requirements file
-            import tempfile
-
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".txt", delete=False, dir=project_path
-            ) as tmp_file:
-                tmp_file.write("\n".join(filtered_reqs))
-                tmp_req_path = tmp_file.name
-
-            install_target = tmp_req_path
-        else:
-            if attempt == 0:
-                console.print(f"[blue]Installing dependencies from {requirements}...[/blue]")
+    has_requirements = os.path.isfile(requirements_path)
+    has_venv, venv_python = _detect_venv(project_path)
+    create_venv = not skip_venv and not has_venv
+    if not skip_venv and not create_venv:
+        console.print("[green]✓[/green] Virtual environment already exists")
+
+    # One environment for every pip run below
+    pip_env = os.environ.copy()
+
+    # Offer the MySQL client before the progress display starts, since it prompts.
+    # mysqlclient can't build on macOS without mysql_config, so install the client
+    # up front rather than retrying a failed pip run
+    if (
+        has_requirements
+        and not skip_mysql
+        and _IS_MAC
+        and _MYSQLCLIENT_REQ_RE.search(requirements_path.read_text())
+        and shutil.which("mysql_config") is None
+    ):
+        console.print("[yellow]⚠[/yellow] MySQL client libraries not found (mysql_config).")
+        if typer.confirm("Auto-install MySQL client via Homebrew?", default=True):
+            if install_mysql_client_macos():
+                # Pick up the MySQL build paths it exported
+                pip_env.update(
+                    {k: os.environ[k] for k in _MYSQL_BUILD_ENV_VARS if k in os.environ}
+                )
             else:
-                console.print(f"[blue]Retrying dependency installation...[/blue]")
-            install_target = requirements
-
-        # Get current environment with any MySQL paths we've set
-        pip_env = os.environ.copy()
+                console.print(
+                    "[yellow]Auto-install failed. Try manually or use --skip-mysql[/yellow]"
+                )
+        console.print()
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Installing packages...", total=None)
+    # Steps 1-3 share one live progress display
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        console=console,
+        auto_refresh=console.is_terminal,
+    ) as progress:
+        # Step 1: Create virtual environment
+        if create_venv:
+            task = progress.add_task("Creating virtual environment...", total=None)
+            result = run_command(
+                [sys.executable, "-m", "venv", "venv"], cwd=project_path, capture=True
+            )
+            progress.remove_task(task)
+            if result.returncode != 0:
+                console.print("[red]Error:[/red] Failed to create virtual environment")
+                if result.stderr:
+                    console.print(f"[dim]{result.stderr.strip()[:500]}[/dim]")
+                raise typer.Exit(1)
+            console.print("[green]✓[/green] Virtual environment created")
+            # A freshly created venv has its interpreter in the standard place
+            venv_python = project_path / _VENV_PY_REL
+
+        # Use venv python if it exists, otherwise use current python
+        python_cmd = os.fspath(venv_python) if venv_python else sys.executable
+
+        # Step 2: Upgrade pip (skipped when it's already recent enough). With a
+        # requirements file the upgrade is folded into the step 3 pip run instead
+        pip_version = _pip_version(python_cmd)
+        upgrade_pip = not (pip_version and pip_version >= _MIN_PIP_VERSION)
+        if not upgrade_pip:
+            console.print(f"[green]✓[/green] pip {pip_version[0]}.{pip_version[1]} is up to date")
+        elif not has_requirements:
+            task = progress.add_task("Upgrading pip...", total=None)
             result = subprocess.run(
-                [python_cmd, "-m", "pip", "install", "-r", install_target],
+                [python_cmd, "-m", "pip", "install", "--upgrade", "pip"],
                 cwd=project_path,
-                capture_output=True,
-                text=True,
                 env=pip_env,
+                capture_output=True,
             )
-            progress.update(task, description="Done!")
+            progress.remove_task(task)
+            if result.returncode == 0:
+                console.print("[green]✓[/green] pip upgraded")
+            else:
+                console.print("[yellow]⚠[/yellow] Could not upgrade pip (continuing anyway)")
 
-        # Clean up temp file if created
-        if skip_mysql and "tmp_req_path" in locals():
-            try:
-                os.unlink(tmp_req_path)
-            except Exception:
-                pass
+        # Step 3: Install requirements in a single pip run
+        if has_requirements:
+            if skip_mysql:
+                console.print(
+                    f"[blue]Installing dependencies from {requirements} (skipping MySQL packages)...[/blue]"
+                )
+            else:
+                console.print(f"[blue]Installing dependencies from {requirements}...[/blue]")
 
+            # A pip>= requirement only upgrades pip itself, unlike --upgrade which
+            # would also upgrade every already-satisfied requirement
+            with (
+                filtered_requirements_file(requirements_path, _MYSQL_REQ_RE)
+                if skip_mysql
+                else contextlib.nullcontext(requirements_path)
+            ) as install_file:
+                result = pip_install_requirements(
+                    python_cmd,
+                    install_file,
+                    cwd=project_path,
+                    env=pip_env,
+                    extra_requirements=(_PIP_MIN_REQUIREMENT,) if upgrade_pip else (),
+                    progress=progress,
+                )
+
+    if has_requirements:
         if result.returncode == 0:
+            if upgrade_pip:
+                console.print("[green]✓[/green] pip upgraded")
             console.print("[green]✓[/green] Dependencies installed")
-            break  # Success!
-        else:
-            # Check if it's a MySQL-related error
-            stderr_lower = result.stderr.lower()
-            is_mysql_error = any(
-                x in stderr_lower
-                for x in ["mysqlclient", "mysql_config", "mariadb_config", "mysql.h"]
+        elif _MYSQL_ERR_RE.search(result.stderr):
+            console.print()
+            console.print(
+                "[yellow]⚠[/yellow] MySQL client installation failed. "
+                "This is common on systems without MySQL development libraries."
             )
+            console.print()
 
-            if is_mysql_error and sys.platform == "darwin" and attempt == 0:
-                # On macOS, offer to auto-install MySQL client
-                console.print()
-                console.print(
-                    "[yellow]⚠[/yellow] MySQL client installation failed. "
-                )
-
-                # Ask user if they want to auto-install
-                if typer.confirm("Auto-install MySQL client via Homebrew?", default=True):
-                    if install_mysql_client_macos():
-                        console.print()
-                        continue  # Retry installation
-                    else:
-                        console.print()
-                        console.print("[yellow]Auto-install failed. Try manually or use --skip-mysql[/yellow]")
-                else:
-                    # User declined, offer alternatives
-                    console.print()
-                    console.print("[bold]Alternatives:[/bold]")
-                    console.print("  • Skip MySQL: [cyan]fastpy install --skip-mysql[/cyan]")
-                    console.print("  • Manual install:")
-                    console.print("    [cyan]brew install mysql-client[/cyan]")
-                    raise typer.Exit(1)
-
-            elif is_mysql_error:
+            # Detect platform and offer solutions
+            if _IS_MAC:
+                console.print("[bold]Options:[/bold]")
+                console.print("  1. Install MySQL client (if using MySQL):")
+                console.print("     [cyan]brew install mysql-client[/cyan]")
                 console.print()
+                console.print("  2. Skip MySQL packages (if using SQLite/PostgreSQL):")
+                console.print("     [cyan]fastpy install --skip-mysql[/cyan]")
+            elif sys.platform == "linux":
+                console.print("[bold]Options:[/bold]")
+                console.print("  1. Install MySQL client (Debian/Ubuntu):")
                 console.print(
-                    "[yellow]⚠[/yellow] MySQL client installation failed. "
-                    "This is common on systems without MySQL development libraries."
+                    "     [cyan]sudo apt-get install libmysqlclient-dev python3-dev[/cyan]"
                 )
+                console.print("  1. Install MySQL client (RHEL/CentOS):")
+                console.print("     [cyan]sudo yum install mysql-devel python3-devel[/cyan]")
                 console.print()
-
-                # Detect platform and offer solutions
-                if sys.platform == "darwin":
-                    console.print("[bold]Options:[/bold]")
-                    console.print("  1. Install MySQL client (if using MySQL):")
-                    console.print("     [cyan]brew install mysql-client[/cyan]")
-                    console.print()
-                    console.print("  2. Skip MySQL packages (if using SQLite/PostgreSQL):")
-                    console.print("     [cyan]fastpy install --skip-mysql[/cyan]")
-                elif sys.platform == "linux":
-                    console.print("[bold]Options:[/bold]")
-                    console.print("  1. Install MySQL client (Debian/Ubuntu):")
-                    console.print(
-                        "     [cyan]sudo apt-get install libmysqlclient-dev python3-dev[/cyan]"
-                    )
-                    console.print("  1. Install MySQL client (RHEL/CentOS):")
-                    console.print("     [cyan]sudo yum install mysql-devel python3-devel[/cyan]")
-                    console.print()
-                    console.print("  2. Skip MySQL packages (if using SQLite/PostgreSQL):")
-                    console.print("     [cyan]fastpy install --skip-mysql[/cyan]")
-                else:
-                    console.print("[bold]Options:[/bold]")
-                    console.print("  1. Install MySQL client from https://dev.mysql.com/downloads/")
-                    console.print("  2. Skip MySQL packages: [cyan]fastpy install --skip-mysql[/cyan]")
-
-                console.print()
-                console.print("[dim]If you only need SQLite for development, use --skip-mysql[/dim]")
-                raise typer.Exit(1)
+                console.print("  2. Skip MySQL packages (if using SQLite/PostgreSQL):")
+                console.print("     [cyan]fastpy install --skip-mysql[/cyan]")
             else:
-                console.print("[red]Error:[/red] Failed to install dependencies")
-                console.print(f"[dim]{result.stderr}[/dim]")
-                raise typer.Exit(1)
+                console.print("[bold]Options:[/bold]")
+                console.print("  1. Install MySQL client from https://dev.mysql.com/downloads/")
+                console.print("  2. Skip MySQL packages: [cyan]fastpy install --skip-mysql[/cyan]")
+
+            console.print()
+            console.print("[dim]If you only need SQLite for development, use --skip-mysql[/dim]")
+            raise typer.Exit(1)
+        else:
+            console.print("[red]Error:[/red] Failed to install dependencies")
+            console.print(f"[dim]{result.stderr}[/dim]")
+            raise typer.Exit(1)
     else:
         console.print(f"[yellow]⚠[/yellow] {requirements} not found, skipping dependency installation")
 
@@ -1918,11 +2407,8 @@ def install_command(
         console.print("[green]✓[/green] Installation complete!")
         console.print()
         console.print("[bold]Next steps:[/bold]")
-        if venv_python.exists():
-            if sys.platform == "win32":
-                console.print("  1. Activate venv: [cyan]venv\\Scripts\\activate[/cyan]")
-            else:
-                console.print("  1. Activate venv: [cyan]source venv/bin/activate[/cyan]")
+        if venv_python:
+            console.print(f"  1. Activate venv: [cyan]{_VENV_ACTIVATE}[/cyan]")
         console.print("  2. Run setup: [cyan]fastpy setup[/cyan]")
         console.print("  3. Start server: [cyan]fastpy serve[/cyan]")
 
@@ -2023,6 +2509,11 @@ fastpy() {
 }
 '''
 
+_SHELL_INTEGRATION_MARKER = b"# Fastpy Shell Integration"
+
+# Appended to the shell config as-is by `fastpy shell:install`
+_SHELL_INTEGRATION_BYTES = ("\n" + SHELL_INTEGRATION_SCRIPT + "\n").encode("utf-8")
+
 
 @app.command("shell:install")
 def shell_install_command() -> None:
@@ -2046,21 +2537,15 @@ def shell_install_command() -> None:
         raise typer.Exit(1)
 
     console.print()
-    console.print(
-        Panel.fit(
-            "[bold blue]Shell Integration[/bold blue]\n"
-            "[dim]Global auto-activate for fastpy projects[/dim]",
-            border_style="blue",
-        )
-    )
+    console.print(_SHELL_PANEL)
     console.print()
 
     # Check if already installed - offer to update
-    existing_content = shell_config.read_text() if shell_config.exists() else ""
-    if "# Fastpy Shell Integration" in existing_content:
+    if _file_contains(shell_config, _SHELL_INTEGRATION_MARKER):
         console.print("[yellow]![/yellow] Shell integration already installed")
         console.print()
         if typer.confirm("Update to latest version?", default=True):
+            existing_content = shell_config.read_text()
             # Remove old integration by finding the marker and removing everything after
             marker_idx = existing_content.find("# Fastpy Shell Integration")
             if marker_idx > 0:
@@ -2091,9 +2576,9 @@ def shell_install_command() -> None:
         console.print("Aborted.")
         raise typer.Exit(0)
 
-    # Add to shell config
-    with open(shell_config, "a") as f:
-        f.write(f"\n{SHELL_INTEGRATION_SCRIPT}\n")
+    # Add to shell config in a single append
+    with open(shell_config, "ab") as f:
+        f.write(_SHELL_INTEGRATION_BYTES)
 
     console.print()
     console.print("[green]✓[/green] Shell integration installed!")
@@ -2138,15 +2623,16 @@ def libs_command(
         )
         console.print()
 
+        from rich.table import Table
+
         table = Table(show_header=True, header_style="bold cyan")
         table.add_column("Lib", style="green")
         table.add_column("Facade", style="yellow")
         table.add_column("Description")
         table.add_column("Dependencies", style="dim")
 
-        for key, lib in AVAILABLE_LIBS.items():
-            deps = ", ".join(lib["dependencies"]) if lib["dependencies"] else "-"
-            table.add_row(key, lib["name"], lib["description"], deps)
+        for row in _LIB_ROWS:
+            table.add_row(*row)
 
         console.print(table)
         console.print()
@@ -2176,7 +2662,7 @@ def libs_command(
         _show_lib_info(lib_name, AVAILABLE_LIBS[lib_name], show_usage)
 
 
-def _show_lib_info(key: str, lib: dict, show_usage: bool = False) -> None:
+def _show_lib_info(key: str, lib: Mapping[str, Any], show_usage: bool = False) -> None:
     """Show information about a specific lib."""
     console.print(
         Panel.fit(
@@ -2353,9 +2839,9 @@ def setup_hooks_command() -> None:
     setup_hooks()
 
 
-def _show_lib_usage(lib_name: str) -> None:
-    """Show usage examples for a lib."""
-    examples = {
+# `fastpy libs <name> --usage` examples, keyed like AVAILABLE_LIBS
+_LIB_EXAMPLES: Mapping[str, str] = MappingProxyType(
+    {
         "http": """
   # GET request
   response = Http.get('https://api.example.com/users')
@@ -2550,78 +3036,100 @@ def _show_lib_usage(lib_name: str) -> None:
   encrypted = Crypt.driver('aes').encrypt('secret')
 """,
     }
+)
 
-    if lib_name in examples:
-        console.print(examples[lib_name])
-    else:
+
+def _show_lib_usage(lib_name: str) -> None:
+    """Show usage examples for a lib."""
+    example = _LIB_EXAMPLES.get(lib_name)
+    if example is None:
         console.print("  [dim]No examples available[/dim]")
+    else:
+        # Plain Python source: skip markup parsing and syntax highlighting
+        console.print(example, markup=False, highlight=False)
+
+
+# Static part of the not-in-project error, parsed from markup once
+_NOT_IN_PROJECT_HINT = Text.from_markup(
+    "\n"
+    "[bold]To create a new project:[/bold]\n"
+    "  [cyan]fastpy new my-api[/cyan]\n"
+    "\n"
+    "[bold]Or if you have an existing project:[/bold]\n"
+    "  [cyan]cd your-project-directory[/cyan]\n"
+    "\n"
+    "[dim]Run 'fastpy --help' to see available commands.[/dim]"
+)
 
 
 def show_not_in_project_error(command: str) -> None:
     """Show helpful error when running project commands outside a project."""
-    console.print()
-    console.print(f"[red]Error:[/red] '{command}' must be run inside a Fastpy project.")
-    console.print()
-    console.print("[bold]To create a new project:[/bold]")
-    console.print("  [cyan]fastpy new my-api[/cyan]")
-    console.print()
-    console.print("[bold]Or if you have an existing project:[/bold]")
-    console.print("  [cyan]cd your-project-directory[/cyan]")
-    console.print()
-    console.print("[dim]Run 'fastpy --help' to see available commands.[/dim]")
+    # The command is user input, so it's added as plain text rather than markup
+    console.print(
+        Text.assemble(
+            "\n",
+            ("Error:", "red"),
+            f" '{command}' must be run inside a Fastpy project.\n",
+            _NOT_IN_PROJECT_HINT,
+        )
+    )
 
 
 # Commands that require being inside a project (proxied to cli.py)
-PROJECT_COMMANDS = {
-    "serve",
-    "test",
-    "make:model",
-    "make:route",
-    "make:resource",
-    "make:schema",
-    "make:service",
-    "make:facade",
-    "make:middleware",
-    "make:admin",
-    "db:migrate",
-    "db:seed",
-    "db:fresh",
-    "db:status",
-    "route:list",
-    "list",
-}
+PROJECT_COMMANDS: frozenset[str] = frozenset(
+    {
+        "serve",
+        "test",
+        "make:model",
+        "make:route",
+        "make:resource",
+        "make:schema",
+        "make:service",
+        "make:facade",
+        "make:middleware",
+        "make:admin",
+        "db:migrate",
+        "db:seed",
+        "db:fresh",
+        "db:status",
+        "route:list",
+        "list",
+    }
+)
+
+# Command namespaces owned by the project CLI, e.g. any `make:*` or `db:*`
+_PROJECT_NAMESPACES: frozenset[str] = frozenset({"make", "db"})
 
 
 def main() -> None:
     """Entry point for the CLI."""
-    # Initialize logger with config
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    # Initialize logger with config, honouring leading verbose/debug flags early
+    flags_first = command is not None and command.startswith("-")
+    flags = frozenset(arg for arg in args if arg.startswith("--")) if flags_first else frozenset()
     config = get_config()
-    setup_logger(log_file=config.log_file)
-
-    # Check if we should proxy to project cli.py
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-
-        # Skip flags when determining command
-        if command.startswith("-"):
-            # Check for verbose/debug flags early
-            if "--verbose" in sys.argv:
-                setup_logger(verbose=True, log_file=config.log_file)
-            if "--debug" in sys.argv:
-                setup_logger(debug=True, log_file=config.log_file)
+    setup_logger(
+        verbose="--verbose" in flags,
+        debug="--debug" in flags,
+        log_file=config.log_file,
+    )
+
+    # Check if we should proxy to project cli.py (skipping flags).
+    # If it's not a fastpy CLI command and we're in a project, proxy it
+    if command is not None and not flags_first and command not in FASTPY_COMMANDS:
+        if is_fastpy_project():
+            log_debug(f"Proxying command '{command}' to project CLI")
+            exit_code = proxy_to_project_cli(args, replace=True)
+            sys.exit(exit_code)
         else:
-            # If it's not a fastpy CLI command and we're in a project, proxy it
-            if command not in FASTPY_COMMANDS:
-                if is_fastpy_project():
-                    log_debug(f"Proxying command '{command}' to project CLI")
-                    exit_code = proxy_to_project_cli(sys.argv[1:])
-                    sys.exit(exit_code)
-                else:
-                    # Check if this is a known project command
-                    if command in PROJECT_COMMANDS or command.startswith("make:") or command.startswith("db:"):
-                        show_not_in_project_error(command)
-                        sys.exit(1)
-                    # Otherwise let typer handle it (will show "No such command" error)
+            # Check if this is a known project command
+            namespace, sep, _ = command.partition(":")
+            if command in PROJECT_COMMANDS or (sep and namespace in _PROJECT_NAMESPACES):
+                show_not_in_project_error(command)
+                sys.exit(1)
+            # Otherwise let typer handle it (will show "No such command" error)
 
     app()
 
@@ -7,13 +7,19 @@ admin user creation, and pre-commit hooks installation.
 These are standalone commands that work within a Fastpy project.
 """
 
+import contextlib
+import functools
 import os
+import re
 import secrets
+import shutil
 import subprocess
 import sys
+from collections import deque
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import typer
 from rich.console import Console
@@ -23,8 +29,22 @@ from rich.prompt import Confirm, Prompt
 
 console = Console()
 
+# Lines of alembic stderr kept for explaining a failure
+_STDERR_TAIL_LINES = 200
 
-@dataclass
+# Alembic stderr markers used to explain a failed migration
+_DB_UNREACHABLE_RE = re.compile(r"connection refused|could not connect", re.IGNORECASE)
+_DB_AUTH_FAILED_RE = re.compile(r"access denied|authentication failed", re.IGNORECASE)
+_DB_MISSING_RE = re.compile(r"unknown database|does not exist", re.IGNORECASE)
+
+# Entries of a project root that identify a Fastpy project
+_PROJECT_MARKERS = frozenset({"main.py", "app", "requirements.txt", "pyproject.toml"})
+
+# KEY=VALUE lines of a .env file; blank lines and # comments never match
+_ENV_LINE_RE = re.compile(r"^[ \t]*([^#\s=][^=\n]*?)[ \t]*=[ \t]*(.*?)\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
 class DatabaseConfig:
     """Database configuration."""
 
@@ -54,27 +74,56 @@ class DatabaseConfig:
             return f"{self.driver}://{self.username}:****@{self.host}:{self.port}/{self.database}"
         return self.url
 
+    @functools.cached_property
+    def client_env(self) -> Optional[dict[str, str]]:
+        """Environment for the psql/mysql clients, or None to inherit ours unchanged.
+
+        The password goes in PGPASSWORD/MYSQL_PWD rather than on the command
+        line, where it would be visible in the process list.
+        """
+        if not self.password:
+            return None
+        var = "PGPASSWORD" if self.driver == "postgresql" else "MYSQL_PWD"
+        return {**os.environ, var: self.password}
+
 
 def check_command_exists(cmd: str) -> bool:
     """Check if a command exists in PATH."""
-    try:
-        subprocess.run(
-            ["which", cmd] if sys.platform != "win32" else ["where", cmd],
-            capture_output=True,
-            check=True,
-        )
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    return shutil.which(cmd) is not None
 
 
 def run_command(
-    cmd: list, capture: bool = True, check: bool = True, **kwargs
+    cmd: list, capture: bool = True, check: bool = True, discard: bool = False, **kwargs
 ) -> subprocess.CompletedProcess:
-    """Run a shell command."""
+    """Run a shell command.
+
+    With ``discard``, output goes to the null device instead of being captured
+    and decoded, for callers that only look at the return code.
+    """
+    if discard:
+        return subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=check, **kwargs
+        )
     return subprocess.run(cmd, capture_output=capture, text=True, check=check, **kwargs)
 
 
+def _run_stderr_tail(cmd: list, env: Optional[dict] = None) -> tuple[int, str]:
+    """Run a command, discarding stdout and keeping only the tail of stderr.
+
+    stderr is read line by line as it is produced, so a chatty command can't
+    grow memory without bound.
+
+    Returns:
+        Tuple of (return code, last lines of stderr)
+    """
+    process = subprocess.Popen(
+        cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    with process:
+        tail = deque(process.stderr, maxlen=_STDERR_TAIL_LINES)
+    return process.returncode, "".join(tail)
+
+
 def get_env_path() -> Path:
     """Get .env file path."""
     return Path.cwd() / ".env"
@@ -83,53 +132,70 @@ def get_env_path() -> Path:
 def read_env() -> dict:
     """Read .env file into dict."""
     env_path = get_env_path()
-    env_vars = {}
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    env_vars[key.strip()] = value.strip()
-    return env_vars
+    if not env_path.exists():
+        return {}
+    return dict(_ENV_LINE_RE.findall(env_path.read_text()))
 
 
 def update_env(key: str, value: str):
     """Update a single key in .env file."""
-    env_path = get_env_path()
+    update_env_values({key: value})
 
-    if not env_path.exists():
-        # Copy from .env.example if exists
-        example_path = Path.cwd() / ".env.example"
-        if example_path.exists():
-            env_path.write_text(example_path.read_text())
-        else:
-            env_path.write_text("")
 
-    content = env_path.read_text()
-    lines = content.split("\n")
-    key_found = False
+@functools.lru_cache(maxsize=32)
+def _env_key_re(key: str) -> re.Pattern[str]:
+    """Compiled pattern for the line assigning ``key`` in a .env file."""
+    return re.compile(rf"^{re.escape(key)}=.*$", re.MULTILINE)
+
+
+def update_env_values(values: dict[str, str]):
+    """Update several keys in .env file with one read and one write."""
+    env_path = get_env_path()
+
+    if env_path.exists():
+        content = env_path.read_text()
+    else:
+        # Start from .env.example if it exists; written out once below
+        example_path = env_path.with_name(".env.example")
+        content = example_path.read_text() if example_path.exists() else ""
 
-    for i, line in enumerate(lines):
-        if line.startswith(f"{key}="):
-            lines[i] = f"{key}={value}"
-            key_found = True
-            break
+    missing = []
+    for key, value in values.items():
+        line = f"{key}={value}"
+        # A function replacement keeps backslashes in values literal
+        content, count = _env_key_re(key).subn(lambda _, line=line: line, content, count=1)
+        if not count:
+            missing.append(line)
 
-    if not key_found:
-        lines.append(f"{key}={value}")
+    if missing:
+        head = content.rstrip("\n") + "\n" if content.strip() else ""
+        content = head + "\n".join(missing) + "\n"
 
-    env_path.write_text("\n".join(lines))
+    env_path.write_text(content)
 
 
 def is_fastpy_project() -> bool:
     """Check if current directory is a Fastpy project."""
-    indicators = [
-        Path("main.py").exists(),
-        Path("app").is_dir(),
-        Path("requirements.txt").exists() or Path("pyproject.toml").exists(),
-    ]
-    return all(indicators)
+    return _is_fastpy_project(os.getcwd())
+
+
+@functools.lru_cache(maxsize=1)
+def _is_fastpy_project(cwd: str) -> bool:
+    """Check the project layout of ``cwd``, cached per working directory."""
+    # One directory listing instead of a stat per marker file
+    is_dir: dict[str, bool] = {}
+    try:
+        with os.scandir(cwd) as entries:
+            for entry in entries:
+                if entry.name in _PROJECT_MARKERS:
+                    is_dir[entry.name] = entry.is_dir()
+    except OSError:
+        return False
+    return (
+        "main.py" in is_dir
+        and is_dir.get("app", False)
+        and ("requirements.txt" in is_dir or "pyproject.toml" in is_dir)
+    )
 
 
 def check_database_server(driver: str) -> tuple[bool, str]:
@@ -137,10 +203,14 @@ def check_database_server(driver: str) -> tuple[bool, str]:
     if driver == "postgresql":
         if check_command_exists("psql"):
             try:
-                result = run_command(["psql", "-U", "postgres", "-c", "SELECT 1"], check=False)
+                result = run_command(
+                    ["psql", "-U", "postgres", "-c", "SELECT 1"], check=False, discard=True
+                )
                 if result.returncode == 0:
                     return True, "PostgreSQL server is running"
-                result = run_command(["psql", "-h", "localhost", "-c", "SELECT 1"], check=False)
+                result = run_command(
+                    ["psql", "-h", "localhost", "-c", "SELECT 1"], check=False, discard=True
+                )
                 if result.returncode == 0:
                     return True, "PostgreSQL server is running"
             except Exception:
@@ -150,7 +220,7 @@ def check_database_server(driver: str) -> tuple[bool, str]:
     elif driver == "mysql":
         if check_command_exists("mysql"):
             try:
-                result = run_command(["mysql", "-e", "SELECT 1"], check=False)
+                result = run_command(["mysql", "-e", "SELECT 1"], check=False, discard=True)
                 if result.returncode == 0:
                     return True, "MySQL server is running"
             except Exception:
@@ -160,32 +230,102 @@ def check_database_server(driver: str) -> tuple[bool, str]:
     return True, "SQLite requires no server"
 
 
+def _connect_server(config: DatabaseConfig) -> Any:
+    """Connect to the database server with a Python driver, if one is installed.
+
+    Returns:
+        An autocommit DB-API connection, or None when psycopg2/pymysql isn't
+        available or the connection fails (callers then use the CLI clients)
+    """
+    try:
+        if config.driver == "postgresql":
+            import psycopg2
+
+            conn = psycopg2.connect(
+                host=config.host,
+                port=config.port,
+                user=config.username,
+                password=config.password or None,
+                dbname="postgres",
+                connect_timeout=5,
+            )
+            conn.autocommit = True
+            return conn
+        if config.driver == "mysql":
+            import pymysql
+
+            return pymysql.connect(
+                host=config.host,
+                port=config.port,
+                user=config.username,
+                password=config.password,
+                connect_timeout=5,
+                autocommit=True,
+            )
+    except Exception:
+        pass
+    return None
+
+
+@contextlib.contextmanager
+def _server_connection(config: DatabaseConfig) -> Iterator[Any]:
+    """Open one driver connection for a series of database probes, closing it after.
+
+    Yields:
+        The connection from _connect_server, or None to use the CLI clients
+    """
+    conn = _connect_server(config)
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def _quote_mysql_identifier(name: str) -> str:
+    """Quote a MySQL identifier, doubling backticks so the name can't end the quoting."""
+    return "`" + name.replace("`", "``") + "`"
+
+
 def check_database_exists(config: DatabaseConfig) -> bool:
     """Check if database exists."""
     if config.driver == "sqlite":
         return Path(f"{config.database}.db").exists()
 
+    with _server_connection(config) as conn:
+        return _database_exists(config, conn)
+
+
+def _database_exists(config: DatabaseConfig, conn: Any) -> bool:
+    """Check if a server database exists, over ``conn`` or the CLI client when it is None."""
+    if conn is not None:
+        query = (
+            "SELECT 1 FROM pg_database WHERE datname = %s"
+            if config.driver == "postgresql"
+            else "SELECT 1 FROM information_schema.schemata WHERE schema_name = %s"
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, (config.database,))
+                return cursor.fetchone() is not None
+        except Exception:
+            return False
+
     if config.driver == "postgresql":
         cmd = ["psql", "-h", config.host, "-p", str(config.port), "-U", config.username, "-lqt"]
-        env = os.environ.copy()
-        if config.password:
-            env["PGPASSWORD"] = config.password
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, env=env, check=False)
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, env=config.client_env, check=False
+            )
             return config.database in result.stdout
         except Exception:
             return False
 
     elif config.driver == "mysql":
         cmd = ["mysql", "-h", config.host, "-P", str(config.port), "-u", config.username]
-        cmd.extend(["-e", f"USE {config.database}"])
-        env = os.environ.copy()
-        if config.password:
-            # Use environment variable instead of command line for security
-            # (password on command line is visible in process list)
-            env["MYSQL_PWD"] = config.password
+        cmd.extend(["-e", f"USE {_quote_mysql_identifier(config.database)}"])
         try:
-            result = subprocess.run(cmd, capture_output=True, env=env, check=False)
+            result = run_command(cmd, check=False, discard=True, env=config.client_env)
             return result.returncode == 0
         except Exception:
             return False
@@ -198,8 +338,36 @@ def create_database(config: DatabaseConfig) -> bool:
     if config.driver == "sqlite":
         return True
 
+    with _server_connection(config) as conn:
+        return _create_database(config, conn)
+
+
+def _create_database(config: DatabaseConfig, conn: Any) -> bool:
+    """Create a server database, over ``conn`` or the CLI client when it is None."""
     console.print(f"[blue]Creating database '{config.database}'...[/blue]")
 
+    if conn is not None:
+        try:
+            with conn.cursor() as cursor:
+                if config.driver == "postgresql":
+                    from psycopg2 import sql
+
+                    cursor.execute(
+                        sql.SQL("CREATE DATABASE {}").format(sql.Identifier(config.database))
+                    )
+                else:
+                    cursor.execute(
+                        "CREATE DATABASE IF NOT EXISTS "
+                        + _quote_mysql_identifier(config.database)
+                    )
+            console.print(f"[green]✓[/green] Database '{config.database}' created successfully")
+            return True
+        except Exception:
+            console.print(
+                "[yellow]⚠[/yellow] Could not create database. You may need to create it manually."
+            )
+            return False
+
     if config.driver == "postgresql":
         cmd = [
             "createdb",
@@ -211,11 +379,8 @@ def create_database(config: DatabaseConfig) -> bool:
             config.username,
             config.database,
         ]
-        env = os.environ.copy()
-        if config.password:
-            env["PGPASSWORD"] = config.password
         try:
-            subprocess.run(cmd, env=env, check=True, capture_output=True)
+            subprocess.run(cmd, env=config.client_env, check=True, capture_output=True)
             console.print(f"[green]✓[/green] Database '{config.database}' created successfully")
             return True
         except subprocess.CalledProcessError:
@@ -226,13 +391,11 @@ def create_database(config: DatabaseConfig) -> bool:
 
     elif config.driver == "mysql":
         cmd = ["mysql", "-h", config.host, "-P", str(config.port), "-u", config.username]
-        cmd.extend(["-e", f"CREATE DATABASE IF NOT EXISTS `{config.database}`"])
-        env = os.environ.copy()
-        if config.password:
-            # Use environment variable instead of command line for security
-            env["MYSQL_PWD"] = config.password
+        cmd.extend(
+            ["-e", f"CREATE DATABASE IF NOT EXISTS {_quote_mysql_identifier(config.database)}"]
+        )
         try:
-            subprocess.run(cmd, check=True, capture_output=True, env=env)
+            subprocess.run(cmd, check=True, capture_output=True, env=config.client_env)
             console.print(f"[green]✓[/green] Database '{config.database}' created successfully")
             return True
         except subprocess.CalledProcessError:
@@ -257,7 +420,7 @@ def setup_env(show_header: bool = True) -> bool:
         console.print(Panel.fit("[bold cyan]Environment Setup[/bold cyan]", border_style="cyan"))
 
     env_path = get_env_path()
-    example_path = Path.cwd() / ".env.example"
+    example_path = env_path.with_name(".env.example")
 
     if env_path.exists():
         console.print("[yellow]⚠[/yellow] .env file already exists")
@@ -319,8 +482,7 @@ def setup_db(
         config = DatabaseConfig(
             driver=driver, host="", port=0, username="", password="", database=database
         )
-        update_env("DB_DRIVER", driver)
-        update_env("DATABASE_URL", config.url)
+        update_env_values({"DB_DRIVER": driver, "DATABASE_URL": config.url})
         console.print(f"[green]✓[/green] SQLite configured: {config.url}")
         return config
 
@@ -365,21 +527,20 @@ def setup_db(
     )
 
     # Update .env
-    update_env("DB_DRIVER", driver)
-    update_env("DATABASE_URL", config.url)
+    update_env_values({"DB_DRIVER": driver, "DATABASE_URL": config.url})
     console.print(f"\n[green]✓[/green] Database URL: {config.masked_url}")
 
-    # Check/create database
-    if check_database_exists(config):
-        console.print(f"[green]✓[/green] Database '{config.database}' exists")
-    elif create:
-        if interactive:
-            if Confirm.ask(
+    # Check/create database over one server connection
+    with _server_connection(config) as conn:
+        if _database_exists(config, conn):
+            console.print(f"[green]✓[/green] Database '{config.database}' exists")
+        elif create and (
+            not interactive
+            or Confirm.ask(
                 f"Database '{config.database}' does not exist. Create it?", default=True
-            ):
-                create_database(config)
-        else:
-            create_database(config)
+            )
+        ):
+            _create_database(config, conn)
 
     return config
 
@@ -407,7 +568,11 @@ def setup_hooks(show_header: bool = True) -> bool:
     if show_header:
         console.print(Panel.fit("[bold cyan]Pre-commit Hooks Setup[/bold cyan]", border_style="cyan"))
 
-    if not Path(".git").exists():
+    # One directory listing answers both the .git and config file checks
+    with os.scandir() as entries:
+        names = {entry.name for entry in entries}
+
+    if ".git" not in names:
         console.print("[dim]Skipped: Not a git repository[/dim]")
         return False
 
@@ -415,16 +580,19 @@ def setup_hooks(show_header: bool = True) -> bool:
         console.print("[dim]Skipped: pre-commit not installed[/dim]")
         return False
 
-    if not Path(".pre-commit-config.yaml").exists():
+    if ".pre-commit-config.yaml" not in names:
         console.print("[dim]Skipped: No .pre-commit-config.yaml found[/dim]")
         return False
 
     with Progress(
-        SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        auto_refresh=console.is_terminal,
     ) as progress:
         task = progress.add_task("Installing pre-commit hooks...", total=None)
         try:
-            run_command(["pre-commit", "install"])
+            run_command(["pre-commit", "install"], discard=True)
             progress.update(task, completed=True)
             console.print("[green]✓[/green] Pre-commit hooks installed")
             return True
@@ -457,9 +625,10 @@ def get_venv_env() -> Optional[dict]:
     """
     venv_python, venv_bin = get_venv_paths()
     if venv_bin:
+        venv_bin_path = os.fspath(venv_bin)
         env = os.environ.copy()
-        env["PATH"] = f"{venv_bin}{os.pathsep}{env.get('PATH', '')}"
-        env["VIRTUAL_ENV"] = str(Path.cwd() / "venv")
+        env["PATH"] = f"{venv_bin_path}{os.pathsep}{env.get('PATH', '')}"
+        env["VIRTUAL_ENV"] = os.path.dirname(venv_bin_path)
         return env
     return None
 
@@ -475,7 +644,7 @@ def get_venv_command(cmd: str) -> list:
         venv_cmd = project_path / "venv" / "bin" / cmd
 
     if venv_cmd.exists():
-        return [str(venv_cmd)]
+        return [os.fspath(venv_cmd)]
 
     # Check if command exists in PATH
     if check_command_exists(cmd):
@@ -535,79 +704,69 @@ def run_migrations(auto_generate: bool = True, show_header: bool = True) -> bool
     if not has_migrations and auto_generate:
         console.print("[blue]Generating initial migration...[/blue]")
         try:
-            subprocess.run(
+            returncode, stderr = _run_stderr_tail(
                 alembic_cmd + ["revision", "--autogenerate", "-m", "Initial migration"],
                 env=venv_env,
-                check=True,
-                capture_output=True,
-                text=True,
             )
-            console.print("[green]✓[/green] Initial migration generated")
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]✗[/red] Failed to generate migration")
-            if e.stderr:
-                # Show relevant error info
-                error_lines = e.stderr.strip().split("\n")
-                for line in error_lines[-5:]:  # Last 5 lines
-                    console.print(f"  [dim]{line}[/dim]")
-            return False
         except FileNotFoundError:
             console.print("[red]✗[/red] Alembic not found")
             show_venv_hint("alembic revision --autogenerate -m 'migration'")
             return False
-
-    console.print("[blue]Running migrations...[/blue]")
-    try:
-        subprocess.run(
-            alembic_cmd + ["upgrade", "head"],
-            env=venv_env,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        console.print("[green]✓[/green] Migrations completed")
-        return True
-    except subprocess.CalledProcessError as e:
-        console.print(f"[red]✗[/red] Migration failed")
-        console.print()
-
-        # Parse common errors and provide helpful messages
-        stderr = e.stderr or ""
-        if "Can't locate revision" in stderr:
-            console.print("[yellow]Possible cause:[/yellow] Missing migration files")
-            console.print("  Try: [cyan]fastpy db:migrate --fresh[/cyan]")
-        elif "connection refused" in stderr.lower() or "could not connect" in stderr.lower():
-            console.print("[yellow]Possible cause:[/yellow] Database server not running")
-            env = read_env()
-            driver = env.get("DB_DRIVER", "unknown")
-            if driver == "mysql":
-                console.print("  Try: [cyan]mysql.server start[/cyan] or [cyan]brew services start mysql[/cyan]")
-            elif driver == "postgresql":
-                console.print("  Try: [cyan]brew services start postgresql[/cyan]")
-        elif "access denied" in stderr.lower() or "authentication failed" in stderr.lower():
-            console.print("[yellow]Possible cause:[/yellow] Invalid database credentials")
-            console.print("  Check: [cyan].env[/cyan] file for DATABASE_URL")
-        elif "unknown database" in stderr.lower() or "does not exist" in stderr.lower():
-            console.print("[yellow]Possible cause:[/yellow] Database does not exist")
-            console.print("  Try: [cyan]fastpy setup:db[/cyan] to create it")
-        else:
-            console.print("[yellow]Please check:[/yellow]")
-            console.print("  1. Database server is running")
-            console.print("  2. Database credentials in .env are correct")
-            console.print("  3. Database exists")
+        if returncode != 0:
+            console.print(f"[red]✗[/red] Failed to generate migration")
             if stderr:
-                console.print()
-                console.print("[dim]Error details:[/dim]")
+                # Show relevant error info
                 error_lines = stderr.strip().split("\n")
-                for line in error_lines[-5:]:
+                for line in error_lines[-5:]:  # Last 5 lines
                     console.print(f"  [dim]{line}[/dim]")
+            return False
+        console.print("[green]✓[/green] Initial migration generated")
 
-        return False
+    console.print("[blue]Running migrations...[/blue]")
+    try:
+        returncode, stderr = _run_stderr_tail(alembic_cmd + ["upgrade", "head"], env=venv_env)
     except FileNotFoundError:
         console.print("[red]✗[/red] Alembic not found")
         show_venv_hint("alembic upgrade head")
         return False
 
+    if returncode == 0:
+        console.print("[green]✓[/green] Migrations completed")
+        return True
+
+    console.print(f"[red]✗[/red] Migration failed")
+    console.print()
+
+    # Parse common errors and provide helpful messages
+    if "Can't locate revision" in stderr:
+        console.print("[yellow]Possible cause:[/yellow] Missing migration files")
+        console.print("  Try: [cyan]fastpy db:migrate --fresh[/cyan]")
+    elif _DB_UNREACHABLE_RE.search(stderr):
+        console.print("[yellow]Possible cause:[/yellow] Database server not running")
+        driver = env_vars.get("DB_DRIVER", "unknown")
+        if driver == "mysql":
+            console.print("  Try: [cyan]mysql.server start[/cyan] or [cyan]brew services start mysql[/cyan]")
+        elif driver == "postgresql":
+            console.print("  Try: [cyan]brew services start postgresql[/cyan]")
+    elif _DB_AUTH_FAILED_RE.search(stderr):
+        console.print("[yellow]Possible cause:[/yellow] Invalid database credentials")
+        console.print("  Check: [cyan].env[/cyan] file for DATABASE_URL")
+    elif _DB_MISSING_RE.search(stderr):
+        console.print("[yellow]Possible cause:[/yellow] Database does not exist")
+        console.print("  Try: [cyan]fastpy setup:db[/cyan] to create it")
+    else:
+        console.print("[yellow]Please check:[/yellow]")
+        console.print("  1. Database server is running")
+        console.print("  2. Database credentials in .env are correct")
+        console.print("  3. Database exists")
+        if stderr:
+            console.print()
+            console.print("[dim]Error details:[/dim]")
+            error_lines = stderr.strip().split("\n")
+            for line in error_lines[-5:]:
+                console.print(f"  [dim]{line}[/dim]")
+    return False
+
 
 def full_setup(
     skip_db: bool = False,
@@ -1,21 +1,18 @@
 """Utility functions for Fastpy CLI."""
 
 import functools
+import re
 import shlex
 import subprocess
 import time
 from typing import Callable, Optional, TypeVar
 
-from rich.console import Console
-
 from fastpy_cli.logger import log_debug, log_warning
 
-console = Console()
-
 T = TypeVar("T")
 
 # Allowlist of safe command prefixes for AI-generated commands
-SAFE_COMMAND_PREFIXES = [
+SAFE_COMMAND_PREFIXES = (
     "fastpy make:",
     "fastpy db:",
     "fastpy route:",
@@ -30,7 +27,33 @@ SAFE_COMMAND_PREFIXES = [
     "fastpy list",
     "fastpy update",
     "fastpy ",
-]
+)
+
+# Shell constructs rejected in AI-generated commands, matched against the lowercased command
+_DANGEROUS_PATTERNS = (
+    "rm -rf",
+    "rm -r /",
+    "> /dev/",
+    "| bash",
+    "| sh",
+    "; bash",
+    "; sh",
+    "curl | ",
+    "wget | ",
+    "eval ",
+    "exec ",
+    "$(",
+    "`",
+    "&&",  # Chained commands need individual validation
+    "||",
+    ";",  # Multiple commands
+)
+_DANGEROUS_RE = re.compile("|".join(map(re.escape, _DANGEROUS_PATTERNS)))
+
+# Characters that need shlex's quoting rules; without them a command is plain words
+_SHLEX_QUOTING_RE = re.compile(r"[\"'\\]")
+# Runs of non-whitespace, using shlex's definition of whitespace
+_SHLEX_WORD_RE = re.compile(r"[^ \t\r\n]+")
 
 
 def retry(
@@ -54,33 +77,36 @@ def retry(
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> T:
-            last_exception: Optional[Exception] = None
-            current_delay = delay
-
-            for attempt in range(max_attempts):
+            if max_attempts < 1:
+                raise RuntimeError("Retry failed without exception")
+
+            # First attempt outside the loop so the common success path sets nothing up
+            try:
+                return func(*args, **kwargs)
+            except exceptions as e:
+                last_exception = e
+
+            for attempt in range(1, max_attempts):
+                current_delay = delay * backoff ** (attempt - 1)
+                log_warning(
+                    f"Attempt {attempt}/{max_attempts} failed: {last_exception}. "
+                    f"Retrying in {current_delay:.1f}s..."
+                )
+                time.sleep(current_delay)
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
                     last_exception = e
-                    if attempt < max_attempts - 1:
-                        log_warning(
-                            f"Attempt {attempt + 1}/{max_attempts} failed: {e}. "
-                            f"Retrying in {current_delay:.1f}s..."
-                        )
-                        time.sleep(current_delay)
-                        current_delay *= backoff
-                    else:
-                        log_debug(f"All {max_attempts} attempts failed")
-
-            if last_exception:
-                raise last_exception
-            raise RuntimeError("Retry failed without exception")
+
+            log_debug(f"All {max_attempts} attempts failed")
+            raise last_exception
 
         return wrapper
 
     return decorator
 
 
+@functools.lru_cache(maxsize=256)
 def is_safe_command(command: str) -> bool:
     """Check if a command is safe to execute.
 
@@ -90,12 +116,11 @@ def is_safe_command(command: str) -> bool:
     Returns:
         True if the command is considered safe
     """
-    command = command.strip()
-
     # Check against allowlist of safe prefixes
-    return any(command.startswith(prefix) for prefix in SAFE_COMMAND_PREFIXES)
+    return command.strip().startswith(SAFE_COMMAND_PREFIXES)
 
 
+@functools.lru_cache(maxsize=256)
 def validate_command(command: str) -> tuple[bool, str]:
     """Validate a command for safe execution.
 
@@ -108,30 +133,11 @@ def validate_command(command: str) -> tuple[bool, str]:
     if not command or not command.strip():
         return False, "Empty command"
 
-    # Check for dangerous patterns
-    dangerous_patterns = [
-        "rm -rf",
-        "rm -r /",
-        "> /dev/",
-        "| bash",
-        "| sh",
-        "; bash",
-        "; sh",
-        "curl | ",
-        "wget | ",
-        "eval ",
-        "exec ",
-        "$(",
-        "`",
-        "&&",  # Chained commands need individual validation
-        "||",
-        ";",  # Multiple commands
-    ]
-
-    command_lower = command.lower()
-    for pattern in dangerous_patterns:
-        if pattern in command_lower:
-            return False, f"Potentially dangerous pattern detected: {pattern}"
+    # Check for dangerous patterns, reporting the first one found in the command
+    # Lowercasing first is several times faster than an IGNORECASE search
+    match = _DANGEROUS_RE.search(command.lower())
+    if match:
+        return False, f"Potentially dangerous pattern detected: {match.group(0)}"
 
     return True, ""
 
@@ -165,7 +171,7 @@ def safe_execute_command(
 
     # Parse command into arguments (safe, no shell injection)
     try:
-        args = shlex.split(command)
+        args = parse_command_safely(command)
     except ValueError as e:
         raise ValueError(f"Invalid command syntax: {e}") from e
 
@@ -186,8 +192,14 @@ def parse_command_safely(command: str) -> list[str]:
 
     Returns:
         List of command arguments
+
+    Raises:
+        ValueError: If the command has unbalanced quotes or a trailing escape
     """
-    return shlex.split(command)
+    if _SHLEX_QUOTING_RE.search(command):
+        return shlex.split(command)
+    # No quotes or escapes, so shlex would just split on whitespace
+    return _SHLEX_WORD_RE.findall(command)
 
 
 def format_duration(seconds: float) -> str:
@@ -203,14 +215,12 @@ def format_duration(seconds: float) -> str:
         return f"{seconds * 1000:.0f}ms"
     elif seconds < 60:
         return f"{seconds:.1f}s"
-    elif seconds < 3600:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
+    # Whole seconds from here on, split with integer divmod
+    minutes, secs = divmod(int(seconds), 60)
+    if minutes < 60:
         return f"{minutes}m {secs}s"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        return f"{hours}h {minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m"
 
 
 def truncate_string(s: str, max_length: int = 100, suffix: str = "...") -> str:
@@ -12,9 +12,9 @@ from typer.testing import CliRunner
 from fastpy_cli.main import app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cli_runner() -> CliRunner:
-    """Create a CLI runner for testing."""
+    """Create a CLI runner for testing, shared since it keeps no state between invocations."""
     return CliRunner()
 
 
@@ -53,11 +53,13 @@ def mock_env_vars(monkeypatch: pytest.MonkeyPatch) -> None:
 
 @pytest.fixture
 def clean_config(temp_dir: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
-    """Create a clean config directory for testing."""
+    """Create a clean config directory and reset the Config singleton for testing."""
     config_dir = temp_dir / ".fastpy"
     config_dir.mkdir()
     monkeypatch.setattr("fastpy_cli.config.CONFIG_DIR", config_dir)
     monkeypatch.setattr("fastpy_cli.config.CONFIG_FILE", config_dir / "config.toml")
+    # Start from a fresh singleton and put the previous one back afterwards
+    monkeypatch.setattr("fastpy_cli.config.Config._instance", None)
     return config_dir
 
 
@@ -1,9 +1,10 @@
 """Tests for AI module."""
 
 import json
-from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
+import respx
 
 from fastpy_cli.ai import (
     AnthropicProvider,
@@ -132,22 +133,21 @@ class TestAnthropicProvider:
         assert provider.api_key == "test-key"
         assert provider.model is not None
 
-    @patch("httpx.post")
-    def test_generate_success(self, mock_post: MagicMock) -> None:
+    @respx.mock
+    def test_generate_success(self) -> None:
         """Test successful generation."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {
-            "content": [{"text": '[{"command": "test", "description": "test"}]'}]
-        }
-        mock_post.return_value = mock_response
+        route = respx.post("https://api.anthropic.com/v1/messages").mock(
+            return_value=httpx.Response(
+                200, json={"content": [{"text": '[{"command": "test", "description": "test"}]'}]}
+            )
+        )
 
         provider = AnthropicProvider("test-key")
         result = provider.generate("test prompt")
 
         assert result is not None
         assert "command" in result
+        assert route.called
 
 
 class TestOpenAIProvider:
@@ -159,22 +159,26 @@ class TestOpenAIProvider:
         assert provider.api_key == "test-key"
         assert provider.model is not None
 
-    @patch("httpx.post")
-    def test_generate_success(self, mock_post: MagicMock) -> None:
+    @respx.mock
+    def test_generate_success(self) -> None:
         """Test successful generation."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": '[{"command": "test", "description": "test"}]'}}]
-        }
-        mock_post.return_value = mock_response
+        route = respx.post("https://api.openai.com/v1/chat/completions").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "choices": [
+                        {"message": {"content": '[{"command": "test", "description": "test"}]'}}
+                    ]
+                },
+            )
+        )
 
         provider = OpenAIProvider("test-key")
         result = provider.generate("test prompt")
 
         assert result is not None
         assert "command" in result
+        assert route.called
 
 
 class TestOllamaProvider:
@@ -8,8 +8,10 @@ import pytest
 from fastpy_cli.config import (
     Config,
     DEFAULT_CONFIG,
+    clear_config_file_cache,
     get_config,
     init_config_file,
+    load_config_file,
 )
 
 
@@ -18,9 +20,6 @@ class TestConfig:
 
     def test_default_values(self, clean_config: Path) -> None:
         """Test that default values are set."""
-        # Reset singleton for clean test
-        Config._instance = None
-
         config = get_config()
         # Check that ai_provider is a valid provider (default from DEFAULT_CONFIG)
         assert config.ai_provider in ["anthropic", "openai", "ollama", "groq", "google"]
@@ -29,7 +28,6 @@ class TestConfig:
 
     def test_get_value(self, clean_config: Path) -> None:
         """Test getting configuration values."""
-        Config._instance = None
         config = get_config()
 
         # Check that provider is a valid value
@@ -38,17 +36,25 @@ class TestConfig:
 
     def test_set_value(self, clean_config: Path) -> None:
         """Test setting configuration values."""
-        Config._instance = None
         config = get_config()
 
         config.set("ai", "provider", "openai")
         assert config.get("ai", "provider") == "openai"
 
+    def test_set_does_not_change_defaults(self, clean_config: Path) -> None:
+        """Test that runtime changes don't leak into DEFAULT_CONFIG."""
+        config = get_config()
+
+        config.set("ai", "timeout", 99)
+
+        assert DEFAULT_CONFIG["ai"]["timeout"] == 30
+        Config._instance = None
+        assert get_config().ai_timeout == 30
+
     def test_env_override(
         self, clean_config: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         """Test that environment variables override config."""
-        Config._instance = None
         monkeypatch.setenv("FASTPY_AI_PROVIDER", "ollama")
 
         config = get_config()
@@ -56,7 +62,6 @@ class TestConfig:
 
     def test_as_dict(self, clean_config: Path) -> None:
         """Test converting config to dictionary."""
-        Config._instance = None
         config = get_config()
 
         config_dict = config.as_dict()
@@ -69,7 +74,6 @@ class TestInitConfigFile:
 
     def test_creates_config_file(self, clean_config: Path) -> None:
         """Test that init creates config file."""
-        Config._instance = None
         from fastpy_cli.config import CONFIG_FILE
 
         # Ensure file doesn't exist
@@ -81,7 +85,6 @@ class TestInitConfigFile:
 
     def test_config_file_content(self, clean_config: Path) -> None:
         """Test that config file has expected content."""
-        Config._instance = None
         from fastpy_cli.config import CONFIG_FILE
 
         if CONFIG_FILE.exists():
@@ -94,30 +97,52 @@ class TestInitConfigFile:
         assert "provider" in content
 
 
+class TestLoadConfigFile:
+    """Tests for load_config_file function."""
+
+    def test_returns_independent_copies(self, clean_config: Path) -> None:
+        """Test that mutating a loaded config doesn't affect the cache."""
+        config_file = clean_config / "config.toml"
+        config_file.write_text('[ai]\nprovider = "openai"\n')
+        clear_config_file_cache()
+
+        first = load_config_file(config_file)
+        first["ai"]["provider"] = "groq"
+
+        assert load_config_file(config_file)["ai"]["provider"] == "openai"
+
+    def test_cache_cleared_after_write(self, clean_config: Path) -> None:
+        """Test that clearing the cache picks up rewritten content."""
+        config_file = clean_config / "config.toml"
+        config_file.write_text('[ai]\nprovider = "openai"\n')
+        clear_config_file_cache()
+        assert load_config_file(config_file)["ai"]["provider"] == "openai"
+
+        config_file.write_text('[ai]\nprovider = "ollama"\n')
+        clear_config_file_cache()
+        assert load_config_file(config_file)["ai"]["provider"] == "ollama"
+
+
 class TestConfigProperties:
     """Tests for config property accessors."""
 
     def test_ai_provider(self, clean_config: Path) -> None:
         """Test ai_provider property."""
-        Config._instance = None
         config = get_config()
         assert isinstance(config.ai_provider, str)
 
     def test_ai_timeout(self, clean_config: Path) -> None:
         """Test ai_timeout property."""
-        Config._instance = None
         config = get_config()
         assert isinstance(config.ai_timeout, int)
         assert config.ai_timeout > 0
 
     def test_default_branch(self, clean_config: Path) -> None:
         """Test default_branch property."""
-        Config._instance = None
         config = get_config()
         assert config.default_branch == "main"
 
     def test_default_git(self, clean_config: Path) -> None:
         """Test default_git property."""
-        Config._instance = None
         config = get_config()
         assert isinstance(config.default_git, bool)
@@ -1,7 +1,10 @@
 """Tests for main CLI commands."""
 
 import os
+import re
+import sys
 from pathlib import Path
+from types import ModuleType
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -11,9 +14,16 @@ from fastpy_cli import __version__
 from fastpy_cli.main import (
     app,
     check_git_installed,
+    filtered_requirements_file,
+    init_git_repo,
     is_fastpy_project,
+    pip_install_requirements,
+    read_requirements,
+    update_env_file,
 )
 
+MYSQL_PATTERN = re.compile(r"mysqlclient\b", re.IGNORECASE)
+
 
 class TestVersionCommand:
     """Tests for the version command."""
@@ -37,6 +47,38 @@ class TestVersionCommand:
         assert __version__ in result.stdout
 
 
+class TestUpgradeCommand:
+    """Tests for the upgrade command."""
+
+    @patch("fastpy_cli.main.subprocess.run")
+    @patch("fastpy_cli.main._latest_version")
+    def test_upgrade_skips_pip_when_latest(
+        self, mock_latest: MagicMock, mock_run: MagicMock, cli_runner: CliRunner
+    ) -> None:
+        """Test that upgrade doesn't run pip when already on the latest version."""
+        mock_latest.return_value = __version__
+
+        result = cli_runner.invoke(app, ["upgrade"])
+
+        assert result.exit_code == 0
+        assert "already the latest" in result.stdout
+        mock_run.assert_not_called()
+
+    @patch("fastpy_cli.main.subprocess.run")
+    @patch("fastpy_cli.main._latest_version")
+    def test_upgrade_runs_pip_when_check_fails(
+        self, mock_latest: MagicMock, mock_run: MagicMock, cli_runner: CliRunner
+    ) -> None:
+        """Test that upgrade falls back to pip when PyPI can't be reached."""
+        mock_latest.return_value = None
+        mock_run.return_value = MagicMock(returncode=0)
+
+        result = cli_runner.invoke(app, ["upgrade"])
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once()
+
+
 class TestHelpCommand:
     """Tests for help output."""
 
@@ -167,6 +209,211 @@ class TestUtilityFunctions:
             assert is_fastpy_project() is True
 
 
+class TestInitGitRepo:
+    """Tests for init_git_repo function."""
+
+    @staticmethod
+    def stub_porcelain(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+        """Install a stub dulwich.porcelain module and return it."""
+        porcelain = MagicMock()
+        dulwich = ModuleType("dulwich")
+        dulwich.porcelain = porcelain
+        monkeypatch.setitem(sys.modules, "dulwich", dulwich)
+        monkeypatch.setitem(sys.modules, "dulwich.porcelain", porcelain)
+        return porcelain
+
+    @patch("fastpy_cli.main.run_command")
+    def test_dulwich_commit_skips_git_cli(
+        self, mock_run: MagicMock, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the git CLI isn't run when dulwich writes the commit."""
+        porcelain = self.stub_porcelain(monkeypatch)
+
+        init_git_repo(temp_dir)
+
+        porcelain.commit.assert_called_once()
+        porcelain.init.return_value.close.assert_called_once()
+        mock_run.assert_not_called()
+
+    @patch("fastpy_cli.main.run_command")
+    def test_dulwich_failure_falls_back_to_git_cli(
+        self, mock_run: MagicMock, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a failed dulwich commit is cleaned up before running the git CLI."""
+        porcelain = self.stub_porcelain(monkeypatch)
+        repo = MagicMock()
+
+        def partial_init(path: Path) -> MagicMock:
+            (path / ".git").mkdir()
+            return repo
+
+        porcelain.init.side_effect = partial_init
+        porcelain.commit.side_effect = OSError("disk full")
+        mock_run.return_value = MagicMock(returncode=0)
+
+        init_git_repo(temp_dir)
+
+        repo.close.assert_called_once()
+        assert not (temp_dir / ".git").exists()
+        assert mock_run.call_args_list[0].args[0] == ["git", "init", "-q"]
+        assert mock_run.call_count == 3
+
+
+class TestUpdateEnvFile:
+    """Tests for update_env_file function."""
+
+    def test_creates_file(self, temp_dir: Path) -> None:
+        """Test that a missing .env file is created."""
+        env_path = temp_dir / ".env"
+        assert update_env_file("OPENAI_API_KEY", "sk-test", env_path) is True
+        assert env_path.read_text() == "OPENAI_API_KEY=sk-test\n"
+
+    def test_replaces_existing_key(self, temp_dir: Path) -> None:
+        """Test that an existing key is replaced in place."""
+        env_path = temp_dir / ".env"
+        env_path.write_text("# comment\nOPENAI_API_KEY=old\nDEBUG=true\n")
+
+        update_env_file("OPENAI_API_KEY", "new", env_path)
+
+        assert env_path.read_text() == "# comment\nOPENAI_API_KEY=new\nDEBUG=true\n"
+
+    def test_appends_missing_key(self, temp_dir: Path) -> None:
+        """Test that a new key is appended after a trailing newline."""
+        env_path = temp_dir / ".env"
+        env_path.write_text("DEBUG=true")
+
+        update_env_file("GROQ_API_KEY", "gsk-test", env_path)
+
+        assert env_path.read_text() == "DEBUG=true\nGROQ_API_KEY=gsk-test\n"
+
+    def test_no_temp_file_left_behind(self, temp_dir: Path) -> None:
+        """Test that the atomic rewrite leaves only the .env file."""
+        env_path = temp_dir / ".env"
+        env_path.write_text("DEBUG=true\n")
+
+        update_env_file("DEBUG", "false", env_path)
+
+        assert [p.name for p in temp_dir.iterdir()] == [".env"]
+        assert env_path.read_text() == "DEBUG=false\n"
+
+    def test_failed_replace_removes_temp_file(self, temp_dir: Path) -> None:
+        """Test that a failed rename leaves the original .env and no temp file."""
+        env_path = temp_dir / ".env"
+        env_path.write_text("DEBUG=true\n")
+
+        with patch("fastpy_cli.main.os.replace", side_effect=OSError("read-only")):
+            assert update_env_file("DEBUG", "false", env_path) is False
+
+        assert [p.name for p in temp_dir.iterdir()] == [".env"]
+        assert env_path.read_text() == "DEBUG=true\n"
+
+    def test_keeps_symlink(self, temp_dir: Path) -> None:
+        """Test that a symlinked .env stays a symlink and its target is updated."""
+        target = temp_dir / "shared.env"
+        target.write_text("DEBUG=true\n")
+        env_path = temp_dir / ".env"
+        env_path.symlink_to(target)
+
+        update_env_file("DEBUG", "false", env_path)
+
+        assert env_path.is_symlink()
+        assert target.read_text() == "DEBUG=false\n"
+
+
+class TestReadRequirements:
+    """Tests for read_requirements function."""
+
+    def test_skips_comments_and_blank_lines(self, temp_dir: Path) -> None:
+        """Test that only requirement lines are returned."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text("# deps\nfastapi>=0.100\n\n  uvicorn  \n")
+
+        assert read_requirements(req_file) == ["fastapi>=0.100", "uvicorn"]
+
+    def test_excludes_packages(self, temp_dir: Path) -> None:
+        """Test that lines matching the exclude pattern are dropped."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text("fastapi\nMySQLClient==2.2\naiomysql\nsqlalchemy[aiomysql]\n")
+        pattern = re.compile(r"(?:mysqlclient|aiomysql)\b", re.IGNORECASE)
+
+        assert read_requirements(req_file, exclude=pattern) == ["fastapi", "sqlalchemy[aiomysql]"]
+
+    def test_strips_inline_comments_and_joins_continuations(self, temp_dir: Path) -> None:
+        """Test that requirement lines are read the way pip reads them."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text(
+            "fastapi  # web\n"
+            "uvicorn \\\n"
+            "    --hash=sha256:abc\n"
+            "pkg#egg  # a '#' without leading space isn't a comment\n"
+        )
+
+        assert read_requirements(req_file) == [
+            "fastapi",
+            "uvicorn     --hash=sha256:abc",
+            "pkg#egg",
+        ]
+
+
+class TestFilteredRequirementsFile:
+    """Tests for filtered_requirements_file function."""
+
+    def test_drops_excluded_requirements_verbatim(self, temp_dir: Path) -> None:
+        """Test that excluded requirements are dropped with their continuation lines."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text(
+            "# deps\n"
+            "fastapi  # web\n"
+            "mysqlclient==2.2 \\\n"
+            "    --hash=sha256:abc\n"
+            "uvicorn \\\n"
+            "    --hash=sha256:def\n"
+        )
+
+        with filtered_requirements_file(req_file, MYSQL_PATTERN) as filtered:
+            assert filtered.parent == temp_dir
+            assert filtered.read_text() == (
+                "# deps\n" "fastapi  # web\n" "uvicorn \\\n" "    --hash=sha256:def\n"
+            )
+
+        assert not filtered.exists()
+
+
+class TestPipInstallRequirements:
+    """Tests for pip_install_requirements function."""
+
+    @staticmethod
+    def _run(requirements_file: Path, **kwargs) -> list[str]:
+        """Run pip_install_requirements against a fake pip and return its argv."""
+        with patch("fastpy_cli.main.subprocess.Popen") as mock_popen:
+            process = mock_popen.return_value
+            process.stdout = iter(["Collecting fastapi\n"])
+            process.stderr = iter([])
+            process.wait.return_value = 0
+            pip_install_requirements("python", requirements_file, **kwargs)
+        return mock_popen.call_args.args[0]
+
+    def test_installs_file_with_extra_requirements(self, temp_dir: Path) -> None:
+        """Test that extra requirements are passed next to -r, not instead of it."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text("fastapi  # web\n")
+
+        cmd = self._run(req_file, extra_requirements=("pip>=23.0",))
+
+        assert cmd[-3:] == ["-r", str(req_file), "pip>=23.0"]
+
+    def test_installs_filtered_file_with_r(self, temp_dir: Path) -> None:
+        """Test that a filtered requirements file still goes to pip with -r."""
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text("fastapi  # web\nmysqlclient \\\n    --hash=sha256:abc\n")
+
+        with filtered_requirements_file(req_file, MYSQL_PATTERN) as filtered:
+            cmd = self._run(filtered)
+
+        assert cmd[-2:] == ["-r", str(filtered)]
+        assert "fastapi  # web" not in cmd
+
+
 class TestVerboseDebugFlags:
     """Tests for verbose and debug flags."""
 
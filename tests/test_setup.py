@@ -0,0 +1,143 @@
+"""Tests for setup module."""
+
+import sys
+from types import ModuleType
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fastpy_cli.setup import (
+    DatabaseConfig,
+    check_database_exists,
+    create_database,
+    setup_db,
+)
+
+
+def make_config(driver: str, database: str = "fastpy_db") -> DatabaseConfig:
+    """Build a server database config for tests."""
+    return DatabaseConfig(
+        driver=driver,
+        host="localhost",
+        port=3306 if driver == "mysql" else 5432,
+        username="root",
+        password="secret",
+        database=database,
+    )
+
+
+def stub_driver(monkeypatch: pytest.MonkeyPatch, name: str) -> MagicMock:
+    """Install a stub DB-API driver module and return its cursor."""
+    cursor = MagicMock()
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+    module = ModuleType(name)
+    module.connect = MagicMock(return_value=conn)
+    monkeypatch.setitem(sys.modules, name, module)
+    return cursor
+
+
+class TestCheckDatabaseExists:
+    """Tests for check_database_exists function."""
+
+    def test_mysql_queries_schemata(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that pymysql is queried with the database name as a parameter."""
+        cursor = stub_driver(monkeypatch, "pymysql")
+        cursor.fetchone.return_value = (1,)
+
+        assert check_database_exists(make_config("mysql")) is True
+        cursor.execute.assert_called_once_with(
+            "SELECT 1 FROM information_schema.schemata WHERE schema_name = %s", ("fastpy_db",)
+        )
+        sys.modules["pymysql"].connect.return_value.close.assert_called_once()
+
+    def test_postgresql_queries_pg_database(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that psycopg2 is queried with the database name as a parameter."""
+        cursor = stub_driver(monkeypatch, "psycopg2")
+        cursor.fetchone.return_value = None
+
+        assert check_database_exists(make_config("postgresql")) is False
+        cursor.execute.assert_called_once_with(
+            "SELECT 1 FROM pg_database WHERE datname = %s", ("fastpy_db",)
+        )
+
+    @patch("fastpy_cli.setup.run_command")
+    def test_falls_back_to_mysql_client(
+        self, mock_run: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the mysql client is used when pymysql isn't installed."""
+        monkeypatch.setitem(sys.modules, "pymysql", None)
+        mock_run.return_value = MagicMock(returncode=0)
+
+        assert check_database_exists(make_config("mysql", "my`db")) is True
+        cmd = mock_run.call_args.args[0]
+        assert cmd[0] == "mysql"
+        assert cmd[-2:] == ["-e", "USE `my``db`"]
+
+    @patch("fastpy_cli.setup.run_command")
+    def test_falls_back_when_connect_fails(
+        self, mock_run: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the mysql client is used when the driver can't connect."""
+        stub_driver(monkeypatch, "pymysql")
+        sys.modules["pymysql"].connect.side_effect = OSError("refused")
+        mock_run.return_value = MagicMock(returncode=1)
+
+        assert check_database_exists(make_config("mysql")) is False
+        mock_run.assert_called_once()
+
+
+class TestCreateDatabase:
+    """Tests for create_database function."""
+
+    def test_mysql_escapes_backticks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a backtick in the name can't end the quoted identifier."""
+        cursor = stub_driver(monkeypatch, "pymysql")
+
+        assert create_database(make_config("mysql", "a`; DROP DATABASE x; --")) is True
+        cursor.execute.assert_called_once_with(
+            "CREATE DATABASE IF NOT EXISTS `a``; DROP DATABASE x; --`"
+        )
+
+    def test_postgresql_uses_identifier(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that psycopg2 composes the name as an SQL identifier."""
+        cursor = stub_driver(monkeypatch, "psycopg2")
+        sql = MagicMock()
+        sys.modules["psycopg2"].sql = sql
+
+        assert create_database(make_config("postgresql")) is True
+        sql.SQL.assert_called_once_with("CREATE DATABASE {}")
+        sql.Identifier.assert_called_once_with("fastpy_db")
+        cursor.execute.assert_called_once_with(sql.SQL.return_value.format.return_value)
+
+    @patch("fastpy_cli.setup.subprocess.run")
+    def test_falls_back_to_createdb(
+        self, mock_run: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that createdb is used when psycopg2 isn't installed."""
+        monkeypatch.setitem(sys.modules, "psycopg2", None)
+
+        assert create_database(make_config("postgresql")) is True
+        cmd = mock_run.call_args.args[0]
+        assert cmd[0] == "createdb"
+        assert cmd[-1] == "fastpy_db"
+
+
+class TestSetupDb:
+    """Tests for setup_db function."""
+
+    @patch("fastpy_cli.setup.update_env_values")
+    @patch("fastpy_cli.setup.check_database_server", return_value=(True, "running"))
+    def test_reuses_one_connection(
+        self, mock_server: MagicMock, mock_update: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the existence check and create share one driver connection."""
+        cursor = stub_driver(monkeypatch, "pymysql")
+        cursor.fetchone.return_value = None
+
+        setup_db(driver="mysql", interactive=False, show_header=False)
+
+        connect = sys.modules["pymysql"].connect
+        connect.assert_called_once()
+        assert cursor.execute.call_count == 2
+        connect.return_value.close.assert_called_once()
@@ -1,11 +1,14 @@
 """Tests for utility functions."""
 
+from unittest.mock import MagicMock, patch
+
 import pytest
 
 from fastpy_cli.utils import (
     format_duration,
     is_safe_command,
     parse_command_safely,
+    retry,
     truncate_string,
     validate_command,
 )
@@ -99,6 +102,16 @@ class TestParseCommandSafely:
         assert "-f" in result
         assert "name:string" in result
 
+    def test_collapses_whitespace(self) -> None:
+        """Test that runs of spaces and tabs separate arguments like shlex."""
+        result = parse_command_safely("  fastpy\tdb:migrate   --fresh ")
+        assert result == ["fastpy", "db:migrate", "--fresh"]
+
+    def test_unbalanced_quote_raises(self) -> None:
+        """Test that an unclosed quote is rejected."""
+        with pytest.raises(ValueError):
+            parse_command_safely('fastpy ai "create a blog')
+
 
 class TestFormatDuration:
     """Tests for format_duration function."""
@@ -145,3 +158,27 @@ class TestTruncateString:
         """Test string at exact max length."""
         result = truncate_string("exact", max_length=5)
         assert result == "exact"
+
+
+class TestRetry:
+    """Tests for the retry decorator."""
+
+    @patch("fastpy_cli.utils.time.sleep")
+    def test_success_does_not_sleep(self, mock_sleep: MagicMock) -> None:
+        """Test that a first-try success returns without retrying."""
+        func = MagicMock(return_value="ok")
+
+        assert retry(max_attempts=3)(func)() == "ok"
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("fastpy_cli.utils.time.sleep")
+    def test_backoff_then_reraise(self, mock_sleep: MagicMock) -> None:
+        """Test exponential delays between attempts and the last error re-raised."""
+        func = MagicMock(side_effect=ValueError("boom"))
+
+        with pytest.raises(ValueError, match="boom"):
+            retry(max_attempts=3, delay=0.5, backoff=2.0, exceptions=(ValueError,))(func)()
+
+        assert func.call_count == 3
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]